@@ -0,0 +1,119 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+
+
+# Content-addressed store of rendered clips. A clip's file name is the hash of
+# (engine, voice, language, rate, text), so the same word is only synthesized
+# once per voice setting. Least recently used clips are evicted once the cache
+# grows past maxBytes; file mtimes keep the recency order across sessions.
+class AudioCache:
+    # AUDIO_CACHE_MAX_MB overrides the default size cap
+    def __init__(self, directory="audio/cache", maxBytes=None) -> None:
+        self.directory = directory
+        self.maxBytes = maxBytes if maxBytes is not None else int(os.getenv("AUDIO_CACHE_MAX_MB", "256")) * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        # path -> size, least recently used first
+        self.entries = OrderedDict()
+        self.totalBytes = 0
+        clips = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if ".tmp" in name or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            clips.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(clips):
+            self.entries[path] = size
+            self.totalBytes += size
+
+    @staticmethod
+    def key(engine, text):
+        parts = list(engine.cacheKey()) + [text]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def pathFor(self, engine, text):
+        return os.path.join(self.directory, self.key(engine, text) + engine.audioExtension)
+
+    def contains(self, engine, text):
+        with self.lock:
+            return self.pathFor(engine, text) in self.entries
+
+    # Path of the cached clip, or None. countLookup=False leaves the hit/miss counters alone
+    def get(self, engine, text, countLookup=True):
+        path = self.pathFor(engine, text)
+        with self.lock:
+            if path not in self.entries or not os.path.exists(path):
+                self.totalBytes -= self.entries.pop(path, 0)
+                self.misses += countLookup
+                return None
+            self.hits += countLookup
+            self.entries.move_to_end(path)
+            self.touch(path)
+            return path
+
+    def touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    # Render through the engine into a temp file and move it into place, so an
+    # interrupted render never leaves a truncated clip behind
+    def render(self, engine, text):
+        path = self.writeClip(engine, text)
+        self.add(path)
+        return path
+
+    # Just the file part of render(), safe to call from other processes sharing the directory
+    def writeClip(self, engine, text):
+        path = self.pathFor(engine, text)
+        tempName = f"{path[:-len(engine.audioExtension)]}.{os.getpid()}-{threading.get_ident()}.tmp{engine.audioExtension}"
+        engine.renderWord(text, tempName)
+        os.replace(tempName, path)
+        return path
+
+    # Leftovers of renders that were interrupted
+    def removeTempFiles(self):
+        for name in os.listdir(self.directory):
+            if ".tmp" in name:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    # Register a clip that was written into the cache directory
+    def add(self, path):
+        size = os.path.getsize(path)
+        with self.lock:
+            self.totalBytes -= self.entries.pop(path, 0)
+            self.entries[path] = size
+            self.totalBytes += size
+            self.evict()
+
+    # Drop least recently used clips, never the one just added
+    def evict(self):
+        while self.totalBytes > self.maxBytes and len(self.entries) > 1:
+            path, size = self.entries.popitem(last=False)
+            self.totalBytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hits / lookups if lookups else 0,
+                "clips": len(self.entries),
+                "bytes": self.totalBytes,
+            }
@@ -0,0 +1,128 @@
+import queue
+import threading
+from AudioCache import AudioCache
+from Instrumentation import timed
+from TextToSpeech import TextToSpeech, findPlayer, playAudioFile
+
+
+# Renders upcoming items into the AudioCache on a worker thread while the user
+# is still answering the current one, so sayWord only has to play a finished
+# clip. The worker makes every engine call, including speaking directly once
+# rendering failed: pyttsx3 engines only work on the thread that created them.
+# The caller's thread only plays files.
+class AudioPipeline(TextToSpeech):
+    def __init__(self, engine, lookahead=3, cache=None) -> None:
+        super().__init__()
+        self.engine = engine
+        self.lookahead = lookahead
+        self.player = findPlayer()
+        self.audioExtension = engine.audioExtension
+        self.enabled = engine.audioExtension is not None and self.player is not None
+        # The engine's cacheKey, asked for once by the worker
+        self.key = None
+        self.cache = None
+        self.pending = {}
+        self.lock = threading.Lock()
+        # (action, text, event) with action "render" or "say"
+        self.requests = queue.Queue()
+        # Set once the worker has the engine's cache key
+        self.ready = threading.Event()
+        self.thread = None
+        if self.enabled:
+            self.cache = cache if cache is not None else AudioCache()
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    # Queue texts for rendering, most urgent first; cached ones are skipped by the worker
+    def prefetch(self, texts):
+        if not self.enabled:
+            return
+        with self.lock:
+            for text in texts:
+                if text not in self.pending:
+                    event = self.pending[text] = threading.Event()
+                    self.requests.put(("render", text, event))
+
+    def run(self):
+        try:
+            # The first engine call, so the engine is created on this thread
+            # and the cache key is known before the caller looks up clips
+            self.key = self.engine.cacheKey()
+        except Exception as e:
+            print(f"Could not start the speech engine: {e}")
+            self.enabled = False
+        self.ready.set()
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            action, text, event = request
+            if action == "say":
+                try:
+                    self.engine.sayWord(text)
+                except Exception as e:
+                    event.error = e
+                event.set()
+                continue
+            try:
+                if not self.enabled:
+                    raise RuntimeError("rendering disabled")
+                if not self.cache.contains(self.engine, text):
+                    self.cache.render(self.engine, text)
+            except Exception as e:
+                # The engine can't render to files, speak directly from now on
+                if self.enabled:
+                    print(f"Could not pre-render '{text}': {e}")
+                self.enabled = False
+            with self.lock:
+                self.pending.pop(text).set()
+
+    # Path of a rendered clip for `text`, rendering it now if it wasn't prefetched
+    def clip(self, text):
+        self.ready.wait()
+        if not self.enabled:
+            return None
+        with self.lock:
+            event = self.pending.get(text)
+        countLookup = True
+        if event is None:
+            path = self.cache.get(self, text)
+            if path is not None:
+                return path
+            countLookup = False
+            self.prefetch([text])
+            with self.lock:
+                event = self.pending.get(text)
+        if event is not None:
+            event.wait()
+        return self.cache.get(self, text, countLookup) if self.enabled else None
+
+    # Clip lookups on the caller's thread go through here, not the engine
+    def cacheKey(self):
+        return self.key
+
+    # Speak `text` with the engine itself, on the worker thread when there is one
+    def speak(self, text):
+        if self.thread is None:
+            self.engine.sayWord(text)
+            return
+        event = threading.Event()
+        event.error = None
+        self.requests.put(("say", text, event))
+        event.wait()
+        if event.error is not None:
+            raise event.error
+
+    @timed("speech.sayWord")
+    def sayWord(self, word):
+        path = self.clip(word) if self.enabled else None
+        if path is None:
+            self.speak(word)
+            return
+        playAudioFile(path, self.player)
+
+    def close(self):
+        if self.thread is not None:
+            self.requests.put(None)
+            self.thread.join()
+            self.thread = None
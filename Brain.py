@@ -1,15 +1,16 @@
 from sys import exit
 import os
-from datetime import datetime
+import random
+import time
 from Word import Word
 from PhrasalVerb import PhrasalVerb
 from TextToSpeech import *
 from Colors import bcolors
-from FileManagment import FileManagement
-from functools import cmp_to_key
-import random
-import nltk
-nltk.download('words')
+from Storage import createStorage
+from Scheduler import Scheduler
+from DueQueue import DueQueue
+from AudioPipeline import AudioPipeline
+from Instrumentation import timed, wrap
 
 
 class Management:
@@ -17,78 +18,98 @@ class Management:
     words = []
     phrasal_verbs = []
 
-    def __init__(self) -> None:
+    # Everything is injectable so sessions can run headless (see Headless.py):
+    # the storage backend, the speech engine and the input/output functions
+    def __init__(self, storage=None, soundEngine=None, inputSource=None, output=None) -> None:
         self.exit_flag = False
-        self.fileMang = FileManagement()
+        # Time spent waiting for the user shows up as "input" when instrumented
+        self.input = wrap("input", inputSource or input)
+        self.output = output or print
+        self.fileMang = storage or createStorage()
         self.language = "en"
-        self.soundEngine = PYTTS()
-        self.words = self.fileMang.readWordsFromJson()
-        self.phrasal_verbs = self.fileMang.readPhrasalVerbsFromJson()
+        self.soundEngine = soundEngine or AudioPipeline(PYTTS())
+        self.words = self.fileMang.readWords()
+        self.phrasal_verbs = self.fileMang.readPhrasalVerbs()
+        self.wordsDue = DueQueue(self.words)
+        self.phrasalVerbsDue = DueQueue(self.phrasal_verbs)
         self.in_menu = True
+        # PRACTICE_SEED makes item selection reproducible
+        seed = os.getenv("PRACTICE_SEED")
+        self.rng = random.Random(int(seed)) if seed else random.Random()
+
+    # SM-2 grade of a turn: right on the first try is perfect recall, needing
+    # to see the answer (any wrong attempt) counts as forgotten
+    @staticmethod
+    def reviewQuality(wrongAttempts):
+        if wrongAttempts == 0:
+            return 5
+        return 2 if wrongAttempts == 1 else 1
 
     def processWord(self, word):
         self.in_menu = False
+        wrongAttempts = 0
         try:
             while True:
-                print(f"{word.asked} times asked, {word.rightCount} times correct, {word.wrongCount} times wrong, {word.streak} streak, {word.getPercentage():.2f}%, category: {word.category}, difficulty:{word.difficulty}")
+                self.output(f"{word.asked} times asked, {word.rightCount} times correct, {word.wrongCount} times wrong, {word.streak} streak, {word.getPercentage():.2f}%, category: {word.category}, difficulty:{word.difficulty}")
                 self.soundEngine.sayWord(word.word)
-                userInput = input("Spell the word\t 'if you want to repeat press `r`'\n\n").strip().lower()
+                userInput = self.input("Spell the word\t 'if you want to repeat press `r`'\n\n").strip().lower()
                 if userInput == "r":
                     continue
-                word.asked += 1
-                if userInput == word.word:
-                    print(f"{bcolors.OKGREEN}{bcolors.BOLD}\nCorrect!\n{bcolors.ENDC}")
-                    word.rightCount += 1
-                    word.streak += 1
+                correct = userInput == word.word
+                word.recordAnswer(correct)
+                if correct:
+                    self.output(f"{bcolors.OKGREEN}{bcolors.BOLD}\nCorrect!\n{bcolors.ENDC}")
                     break
                 else:
-                    print(f"{bcolors.FAIL}{bcolors.BOLD}\nIncorrect, try again.\n{bcolors.ENDC}")
-                    print(f"{bcolors.OKGREEN}{bcolors.BOLD}\n{word.word} != {bcolors.WARNING}{userInput}\n{bcolors.ENDC}")
-                    word.wrongCount += 1
-                    word.streak = 0
+                    self.output(f"{bcolors.FAIL}{bcolors.BOLD}\nIncorrect, try again.\n{bcolors.ENDC}")
+                    self.output(f"{bcolors.OKGREEN}{bcolors.BOLD}\n{word.word} != {bcolors.WARNING}{userInput}\n{bcolors.ENDC}")
+                    wrongAttempts += 1
             word.update_category()
+            word.review(self.reviewQuality(wrongAttempts), time.time())
+            self.wordsDue.update(word)
         except KeyboardInterrupt:
-            print("\nInterrupted. Returning to main menu...")
+            self.output("\nInterrupted. Returning to main menu...")
             raise
 
     # New method to process phrasal verbs similar to processWord
     def processPhrasalVerb(self, phrasal_verb):
         self.in_menu = False
+        wrongAttempts = 0
         try:
             while True:
                 self.soundEngine.sayWord(phrasal_verb.phrasal_verb)
-                userInput = input("Spell the phrasal verb\t 'if you want to repeat press `r`'\n\n").strip().lower()
+                userInput = self.input("Spell the phrasal verb\t 'if you want to repeat press `r`'\n\n").strip().lower()
                 if userInput == "r":
                     continue
-                phrasal_verb.asked += 1
-                if userInput == phrasal_verb.phrasal_verb:
-                    print(f"{bcolors.OKGREEN}{bcolors.BOLD}\nCorrect!\n{bcolors.ENDC}")
-                    phrasal_verb.rightCount += 1
-                    phrasal_verb.streak += 1
+                correct = userInput == phrasal_verb.phrasal_verb
+                phrasal_verb.recordAnswer(correct)
+                if correct:
+                    self.output(f"{bcolors.OKGREEN}{bcolors.BOLD}\nCorrect!\n{bcolors.ENDC}")
                     break
                 else:
-                    print(f"{bcolors.FAIL}{bcolors.BOLD}\nIncorrect, try again.\n{bcolors.ENDC}")
-                    print(f"{bcolors.OKGREEN}{bcolors.BOLD}\n{phrasal_verb.phrasal_verb} != {bcolors.WARNING}{userInput}\n{bcolors.ENDC}")
-                    phrasal_verb.wrongCount += 1
-                    phrasal_verb.streak = 0
+                    self.output(f"{bcolors.FAIL}{bcolors.BOLD}\nIncorrect, try again.\n{bcolors.ENDC}")
+                    self.output(f"{bcolors.OKGREEN}{bcolors.BOLD}\n{phrasal_verb.phrasal_verb} != {bcolors.WARNING}{userInput}\n{bcolors.ENDC}")
+                    wrongAttempts += 1
             phrasal_verb.update_category()
+            phrasal_verb.review(self.reviewQuality(wrongAttempts), time.time())
+            self.phrasalVerbsDue.update(phrasal_verb)
         except KeyboardInterrupt:
-            print("\nInterrupted. Returning to main menu...")
+            self.output("\nInterrupted. Returning to main menu...")
             raise
 
     def addWord(self):
-        word = input("Insert the word\n").strip()
-        if any(savedWord.word == word for savedWord in self.words):
-            print(f"{bcolors.BOLD}{bcolors.WARNING}Already Exists\n{bcolors.ENDC}")
+        word = self.input("Insert the word\n").strip()
+        if word in self.words:
+            self.output(f"{bcolors.BOLD}{bcolors.WARNING}Already Exists\n{bcolors.ENDC}")
             return
         self.words.append(Word(word))
         self.fileMang.saveWords(self.words)
 
     # New method to add a phrasal verb
     def addPhrasalVerb(self):
-        phrasal_verb = input("Insert the phrasal verb\n").strip()
-        if any(saved_pv.phrasal_verb == phrasal_verb for saved_pv in self.phrasal_verbs):
-            print(f"{bcolors.BOLD}{bcolors.WARNING}Already Exists\n{bcolors.ENDC}")
+        phrasal_verb = self.input("Insert the phrasal verb\n").strip()
+        if phrasal_verb in self.phrasal_verbs:
+            self.output(f"{bcolors.BOLD}{bcolors.WARNING}Already Exists\n{bcolors.ENDC}")
             return
         self.phrasal_verbs.append(PhrasalVerb(phrasal_verb))
         self.fileMang.savePhrasalVerbs(self.phrasal_verbs)
@@ -97,16 +118,18 @@ class Management:
         if self.in_menu:
             self.fileMang.saveWords(self.words)
             self.fileMang.savePhrasalVerbs(self.phrasal_verbs)
-            print("CTRL-C detected. Exiting gracefully and saving")
+            self.fileMang.close()
+            self.soundEngine.close()
+            self.output("CTRL-C detected. Exiting gracefully and saving")
             exit(0)
         else:
             raise KeyboardInterrupt
 
     def filterWordsByCategory(self, category_filter):
         if category_filter:
-            filtered_words = [w for w in self.words if w.category == category_filter]
+            filtered_words = self.words.bucket(category_filter)
             if not filtered_words:
-                print(f"\n{bcolors.WARNING}No words in the {category_filter} category! Using all words instead.{bcolors.ENDC}")
+                self.output(f"\n{bcolors.WARNING}No words in the {category_filter} category! Using all words instead.{bcolors.ENDC}")
                 return self.words
             return filtered_words
         return self.words
@@ -114,127 +137,207 @@ class Management:
     # New method to filter phrasal verbs by category
     def filterPhrasalVerbsByCategory(self, category_filter):
         if category_filter:
-            filtered_pvs = [pv for pv in self.phrasal_verbs if pv.category == category_filter]
+            filtered_pvs = self.phrasal_verbs.bucket(category_filter)
             if not filtered_pvs:
-                print(f"\n{bcolors.WARNING}No phrasal verbs in the {category_filter} category! Using all phrasal verbs instead.{bcolors.ENDC}")
+                self.output(f"\n{bcolors.WARNING}No phrasal verbs in the {category_filter} category! Using all phrasal verbs instead.{bcolors.ENDC}")
                 return self.phrasal_verbs
             return filtered_pvs
         return self.phrasal_verbs
 
+    # One practice turn: pick, ask, re-schedule and persist the answered word
+    @timed("turn.word")
+    def wordTurn(self, scheduler, category_filter=None):
+        self.syncFromStorage(scheduler)
+        chosenWord = scheduler.next()
+        self.soundEngine.prefetch([chosenWord.word] + [w.word for w in scheduler.upcoming(self.soundEngine.lookahead)])
+        self.processWord(chosenWord)
+        if category_filter and chosenWord.category != category_filter:
+            # The session follows the live category bucket
+            scheduler.remove(chosenWord)
+        else:
+            scheduler.update(chosenWord)
+        self.fileMang.recordWord(chosenWord)
+        return chosenWord
+
+    @timed("turn.phrasalVerb")
+    def phrasalVerbTurn(self, scheduler, category_filter=None):
+        self.syncFromStorage(scheduler)
+        chosen_pv = scheduler.next()
+        self.soundEngine.prefetch([chosen_pv.phrasal_verb] + [pv.phrasal_verb for pv in scheduler.upcoming(self.soundEngine.lookahead)])
+        self.processPhrasalVerb(chosen_pv)
+        if category_filter and chosen_pv.category != category_filter:
+            # The session follows the live category bucket
+            scheduler.remove(chosen_pv)
+        else:
+            scheduler.update(chosen_pv)
+        self.fileMang.recordPhrasalVerb(chosen_pv)
+        return chosen_pv
+
+    # Pick up what other processes sharing the storage answered since the last
+    # turn. Items new to the deck join the next session, not the running one.
+    def syncFromStorage(self, scheduler=None):
+        for item in self.fileMang.refresh():
+            if scheduler is not None and item in scheduler:
+                scheduler.update(item)
+            due = self.wordsDue if isinstance(item, Word) else self.phrasalVerbsDue
+            due.update(item)
+
     def wordLoop(self):
         self.in_menu = False
-        print("\nWhich category would you like to focus on?")
-        print(f"1. {bcolors.FAIL}Struggling words{bcolors.ENDC}")
-        print(f"2. {bcolors.WARNING}Average words{bcolors.ENDC}")
-        print(f"3. {bcolors.OKGREEN}Mastered words{bcolors.ENDC}")
-        print(f"4. All words (mixed)")
-        choice = input("\nEnter your choice (1-4): ").strip()
+        self.output("\nWhich category would you like to focus on?")
+        self.output(f"1. {bcolors.FAIL}Struggling words{bcolors.ENDC}")
+        self.output(f"2. {bcolors.WARNING}Average words{bcolors.ENDC}")
+        self.output(f"3. {bcolors.OKGREEN}Mastered words{bcolors.ENDC}")
+        self.output(f"4. All words (mixed)")
+        self.output(f"5. {bcolors.OKCYAN}Words due for review{bcolors.ENDC}")
+        choice = self.input("\nEnter your choice (1-5): ").strip()
+        if choice == "5":
+            self.dueWordLoop()
+            return
         category_filter = {
             "1": Word.CATEGORY_STRUGGLING,
             "2": Word.CATEGORY_AVERAGE,
             "3": Word.CATEGORY_MASTERED
         }.get(choice)
         filtered_words = self.filterWordsByCategory(category_filter)
+        if filtered_words is self.words:
+            category_filter = None
+        scheduler = Scheduler(filtered_words, self.rng)
         try:
             while True:
-                print(len(self.words))
-                temp = sorted(filtered_words, key=cmp_to_key(Word.cmp))
-                chosenWord = temp[0] if random.random() < 0.7 and temp else random.choice(filtered_words)
-                self.processWord(chosenWord)
-                self.fileMang.saveWords(self.words)
+                self.output(len(self.words))
+                if not len(scheduler):
+                    if category_filter:
+                        self.output(f"\n{bcolors.WARNING}No {category_filter} words left!{bcolors.ENDC}")
+                    else:
+                        self.output(f"\n{bcolors.WARNING}No words available! Please add some first.{bcolors.ENDC}")
+                    break
+                self.wordTurn(scheduler, category_filter)
         except KeyboardInterrupt:
-            print("\nReturning to main menu...")
+            self.output("\nReturning to main menu...")
             self.fileMang.saveWords(self.words)
             self.in_menu = True
-            self.mainSystemLoop()
             
     def phrasalVerbLoop(self):
         self.in_menu = False
-        print("\nWhich category would you like to focus on?")
-        print(f"1. {bcolors.FAIL}Struggling phrasal verbs{bcolors.ENDC}")
-        print(f"2. {bcolors.WARNING}Average phrasal verbs{bcolors.ENDC}")
-        print(f"3. {bcolors.OKGREEN}Mastered phrasal verbs{bcolors.ENDC}")
-        print(f"4. All phrasal verbs (mixed)")
-        choice = input("\nEnter your choice (1-4): ").strip()
+        self.output("\nWhich category would you like to focus on?")
+        self.output(f"1. {bcolors.FAIL}Struggling phrasal verbs{bcolors.ENDC}")
+        self.output(f"2. {bcolors.WARNING}Average phrasal verbs{bcolors.ENDC}")
+        self.output(f"3. {bcolors.OKGREEN}Mastered phrasal verbs{bcolors.ENDC}")
+        self.output(f"4. All phrasal verbs (mixed)")
+        self.output(f"5. {bcolors.OKCYAN}Phrasal verbs due for review{bcolors.ENDC}")
+        choice = self.input("\nEnter your choice (1-5): ").strip()
+        if choice == "5":
+            self.duePhrasalVerbLoop()
+            return
         category_filter = {
             "1": PhrasalVerb.CATEGORY_STRUGGLING,
             "2": PhrasalVerb.CATEGORY_AVERAGE,
             "3": PhrasalVerb.CATEGORY_MASTERED
         }.get(choice)
         filtered_pvs = self.filterPhrasalVerbsByCategory(category_filter)
+        if filtered_pvs is self.phrasal_verbs:
+            category_filter = None
+        scheduler = Scheduler(filtered_pvs, self.rng)
         try:
             while True:
-                if not filtered_pvs:
-                    print(f"\n{bcolors.WARNING}No phrasal verbs available! Please add some first.{bcolors.ENDC}")
+                if not len(scheduler):
+                    if category_filter:
+                        self.output(f"\n{bcolors.WARNING}No {category_filter} phrasal verbs left!{bcolors.ENDC}")
+                    else:
+                        self.output(f"\n{bcolors.WARNING}No phrasal verbs available! Please add some first.{bcolors.ENDC}")
                     break
-                temp = sorted(filtered_pvs, key=cmp_to_key(PhrasalVerb.cmp))
-                chosen_pv = temp[0] if random.random() < 0.7 and temp else random.choice(filtered_pvs)
+                self.phrasalVerbTurn(scheduler, category_filter)
+        except KeyboardInterrupt:
+            self.output("\nReturning to main menu...")
+            self.fileMang.savePhrasalVerbs(self.phrasal_verbs)
+            self.in_menu = True
+
+    # Spaced repetition session: only items whose review is due, earliest first
+    def dueWordLoop(self):
+        try:
+            while True:
+                self.syncFromStorage()
+                chosenWord = self.wordsDue.nextDue(time.time())
+                if chosenWord is None:
+                    self.output(f"\n{bcolors.OKGREEN}No words are due for review right now!{bcolors.ENDC}")
+                    break
+                self.soundEngine.prefetch([chosenWord.word])
+                self.processWord(chosenWord)
+                self.fileMang.recordWord(chosenWord)
+        except KeyboardInterrupt:
+            self.output("\nReturning to main menu...")
+            self.fileMang.saveWords(self.words)
+            self.in_menu = True
+
+    def duePhrasalVerbLoop(self):
+        try:
+            while True:
+                self.syncFromStorage()
+                chosen_pv = self.phrasalVerbsDue.nextDue(time.time())
+                if chosen_pv is None:
+                    self.output(f"\n{bcolors.OKGREEN}No phrasal verbs are due for review right now!{bcolors.ENDC}")
+                    break
+                self.soundEngine.prefetch([chosen_pv.phrasal_verb])
                 self.processPhrasalVerb(chosen_pv)
-                self.fileMang.savePhrasalVerbs(self.phrasal_verbs)
+                self.fileMang.recordPhrasalVerb(chosen_pv)
         except KeyboardInterrupt:
-            print("\nReturning to main menu...")
+            self.output("\nReturning to main menu...")
             self.fileMang.savePhrasalVerbs(self.phrasal_verbs)
             self.in_menu = True
-            self.mainSystemLoop()
 
+    # Report aggregates of both decks as plain dicts (see Report.buildReport),
+    # from the storage backend's reportStats
+    def report(self):
+        self.syncFromStorage()
+        return {
+            "words": self.fileMang.reportStats(self.words, "word"),
+            "phrasal_verbs": self.fileMang.reportStats(self.phrasal_verbs, "phrasal_verb"),
+        }
+
+    @timed("report.miniReport")
     def miniReport(self):
-        print(f"Total Number of words Saved = {bcolors.BOLD}{bcolors.WARNING}{len(self.words)}{bcolors.ENDC}")
-        print(f"Total Number of phrasal verbs Saved = {bcolors.BOLD}{bcolors.WARNING}{len(self.phrasal_verbs)}{bcolors.ENDC}")
+        report = self.report()
+        self.output(f"Total Number of words Saved = {bcolors.BOLD}{bcolors.WARNING}{len(self.words)}{bcolors.ENDC}")
+        self.output(f"Total Number of phrasal verbs Saved = {bcolors.BOLD}{bcolors.WARNING}{len(self.phrasal_verbs)}{bcolors.ENDC}")
         
-        # Process words
-        categories = {
-            Word.CATEGORY_MASTERED: "Mastered Words",
-            Word.CATEGORY_AVERAGE: "Average Words",
-            Word.CATEGORY_STRUGGLING: "Struggling Words"
-        }
         categories_colors = {
             Word.CATEGORY_MASTERED: "OKGREEN",
             Word.CATEGORY_AVERAGE: "WARNING",
             Word.CATEGORY_STRUGGLING: "FAIL"
         }
-        
-        print("\n--- WORDS REPORT ---")
-        for category, label in categories.items():
-            count = len([w for w in self.words if w.category == category])
-            print(f"{getattr(bcolors, categories_colors[category])}{label}:{bcolors.ENDC} {count}")
-        struggling_words = [w for w in self.words if w.category == Word.CATEGORY_STRUGGLING and w.asked > 1]
-        struggling_words = sorted(struggling_words, key=cmp_to_key(lambda a, b: a.getPercentage() - b.getPercentage()))
-        mastered_words = [w for w in self.words if w.category == Word.CATEGORY_MASTERED and w.asked > 1]
-        
-        print(f"\n{bcolors.FAIL}{bcolors.BOLD}Your struggling words are:{bcolors.ENDC}")
-        print("\n".join(f"{w.word}:\t {w.getPercentage():.2f}%,\t Streak: {w.streak}" for w in struggling_words) or "No struggling words identified yet!")
-        print(f"\n{bcolors.OKGREEN}{bcolors.BOLD}Your mastered words are:{bcolors.ENDC}")
-        print("\n".join(f"{w.word}:\t {w.getPercentage():.2f}%, \t Streak: {w.streak}" for w in mastered_words[:5]) or "No mastered words yet - keep practicing!")
-        if len(mastered_words) > 5:
-            print(f"...and {len(mastered_words) - 5} more mastered words.")
-            
-        # Process phrasal verbs
-        print("\n--- PHRASAL VERBS REPORT ---")
-        pv_categories = {
-            PhrasalVerb.CATEGORY_MASTERED: "Mastered Phrasal Verbs",
-            PhrasalVerb.CATEGORY_AVERAGE: "Average Phrasal Verbs",
-            PhrasalVerb.CATEGORY_STRUGGLING: "Struggling Phrasal Verbs"
-        }
-        for category, label in pv_categories.items():
-            count = len([pv for pv in self.phrasal_verbs if pv.category == category])
-            print(f"{getattr(bcolors, categories_colors[category])}{label}:{bcolors.ENDC} {count}")
-        struggling_pvs = [pv for pv in self.phrasal_verbs if pv.category == PhrasalVerb.CATEGORY_STRUGGLING and pv.asked > 1]
-        struggling_pvs = sorted(struggling_pvs, key=cmp_to_key(lambda a, b: a.getPercentage() - b.getPercentage()))
-        mastered_pvs = [pv for pv in self.phrasal_verbs if pv.category == PhrasalVerb.CATEGORY_MASTERED and pv.asked > 1]
-        
-        print(f"\n{bcolors.FAIL}{bcolors.BOLD}Your struggling phrasal verbs are:{bcolors.ENDC}")
-        print("\n".join(f"{pv.phrasal_verb}:\t {pv.getPercentage():.2f}%,\t Streak: {pv.streak}" for pv in struggling_pvs) or "No struggling phrasal verbs identified yet!")
-        print(f"\n{bcolors.OKGREEN}{bcolors.BOLD}Your mastered phrasal verbs are:{bcolors.ENDC}")
-        print("\n".join(f"{pv.phrasal_verb}:\t {pv.getPercentage():.2f}%, \t Streak: {pv.streak}" for pv in mastered_pvs[:5]) or "No mastered phrasal verbs yet - keep practicing!")
-        if len(mastered_pvs) > 5:
-            print(f"...and {len(mastered_pvs) - 5} more mastered phrasal verbs.")
+        for stats, title, noun in ((report["words"], "WORDS", "words"), (report["phrasal_verbs"], "PHRASAL VERBS", "phrasal verbs")):
+            self.output(f"\n--- {title} REPORT ---")
+            for category in (Word.CATEGORY_MASTERED, Word.CATEGORY_AVERAGE, Word.CATEGORY_STRUGGLING):
+                self.output(f"{getattr(bcolors, categories_colors[category])}{category.capitalize()} {noun.title()}:{bcolors.ENDC} {stats['counts'][category]}")
+            if stats["answers"]:
+                self.output(f"Accuracy: {stats['accuracy']:.2f}% over {stats['answers']} answers, median {noun[:-1]} {stats['percentiles']['p50']:.2f}%")
+
+            self.output(f"\n{bcolors.FAIL}{bcolors.BOLD}Your struggling {noun} are:{bcolors.ENDC}")
+            self.output("\n".join(f"{text}:\t {percentage:.2f}%,\t Streak: {streak}" for text, percentage, streak in stats["struggling"]) or f"No struggling {noun} identified yet!")
+            if stats["strugglingTotal"] > len(stats["struggling"]):
+                self.output(f"...and {stats['strugglingTotal'] - len(stats['struggling'])} more struggling {noun}.")
+            self.output(f"\n{bcolors.OKGREEN}{bcolors.BOLD}Your mastered {noun} are:{bcolors.ENDC}")
+            self.output("\n".join(f"{text}:\t {percentage:.2f}%, \t Streak: {streak}" for text, percentage, streak in stats["mastered"]) or f"No mastered {noun} yet - keep practicing!")
+            if stats["masteredTotal"] > len(stats["mastered"]):
+                self.output(f"...and {stats['masteredTotal'] - len(stats['mastered'])} more mastered {noun}.")
+
+    # A reset clears every review schedule, so the due queues start over
+    def resetWordScore(self):
+        self.fileMang.resetWordScore()
+        self.wordsDue = DueQueue(self.words)
+
+    def resetPhrasalVerbScore(self):
+        self.fileMang.resetPhrasalVerbScore()
+        self.phrasalVerbsDue = DueQueue(self.phrasal_verbs)
 
+    # Menu dispatcher: every action returns here, so the stack depth stays the
+    # same however long the session runs
     def mainSystemLoop(self):
-        self.in_menu = True
         menu_options = {
             "1": self.wordLoop,
             "2": self.addWord,
-            "3": self.fileMang.resetWordScore,
+            "3": self.resetWordScore,
             "4": self.miniReport,
             "5": lambda: os.system("clear"),
             "6": self.addWordLoop,
@@ -242,28 +345,29 @@ class Management:
             "8": self.phrasalVerbLoop,
             "9": self.addPhrasalVerb,
             "10": self.addPhrasalVerbLoop,
-            "11": self.fileMang.resetPhrasalVerbScore,
+            "11": self.resetPhrasalVerbScore,
         }
         try:
-            choice = input(
-                "Press 1 to start a word training session,\n"
-                "Press 2 to add a new word,\n"
-                "Press 3 to reset words score,\n"
-                "Press 4 to show your performance report,\n"
-                "Press 5 to clear the console,\n"
-                "Press 6 to add a word (LOOP),\n"
-                "Press 7 to re-categorize all words\n"
-                "Press 8 to start a phrasal verb training session,\n"
-                "Press 9 to add a new phrasal verb,\n"
-                "Press 10 to add phrasal verbs (LOOP)\n"
-                "Press 11 to reset phrasal verbs score\n"
-            ).strip()
-            action = menu_options.get(choice)
-            if action:
-                action()
-            else:
-                print(f"{bcolors.FAIL}Invalid choice!{bcolors.ENDC}")
-            self.mainSystemLoop()
+            while not self.exit_flag:
+                self.in_menu = True
+                choice = self.input(
+                    "Press 1 to start a word training session,\n"
+                    "Press 2 to add a new word,\n"
+                    "Press 3 to reset words score,\n"
+                    "Press 4 to show your performance report,\n"
+                    "Press 5 to clear the console,\n"
+                    "Press 6 to add a word (LOOP),\n"
+                    "Press 7 to re-categorize all words\n"
+                    "Press 8 to start a phrasal verb training session,\n"
+                    "Press 9 to add a new phrasal verb,\n"
+                    "Press 10 to add phrasal verbs (LOOP)\n"
+                    "Press 11 to reset phrasal verbs score\n"
+                ).strip()
+                action = menu_options.get(choice)
+                if action:
+                    action()
+                else:
+                    self.output(f"{bcolors.FAIL}Invalid choice!{bcolors.ENDC}")
         except KeyboardInterrupt:
             self.saveOnExit(None, None)
 
@@ -273,9 +377,8 @@ class Management:
             while True:
                 self.addWord()
         except KeyboardInterrupt:
-            print("\nReturning to main menu...")
+            self.output("\nReturning to main menu...")
             self.in_menu = True
-            self.mainSystemLoop()
 
     # New method for adding phrasal verbs in a loop
     def addPhrasalVerbLoop(self):
@@ -284,30 +387,18 @@ class Management:
             while True:
                 self.addPhrasalVerb()
         except KeyboardInterrupt:
-            print("\nReturning to main menu...")
+            self.output("\nReturning to main menu...")
             self.in_menu = True
-            self.mainSystemLoop()
 
+    @timed("recategorizeWords")
     def recategorizeWords(self):
-        for word in self.words:
-            word.update_category()
+        from Scoring import recategorize
+        # A full pass; only items whose category changes become dirty and saved
+        recategorize(self.words)
         self.fileMang.saveWords(self.words)
         
         # Also recategorize phrasal verbs
-        for pv in self.phrasal_verbs:
-            pv.update_category()
+        recategorize(self.phrasal_verbs)
         self.fileMang.savePhrasalVerbs(self.phrasal_verbs)
         
-        print(f"{bcolors.OKGREEN}All words and phrasal verbs have been recategorized!{bcolors.ENDC}")
-        self.mainSystemLoop()
-
-        # Archive and reset phrasal verbs
-        pv_archive_name = f"data/Archive-PhrasalVerbs-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
-        if os.path.exists(self.phrasalVerbFileName):
-            os.rename(self.phrasalVerbFileName, pv_archive_name)
-        for pv in self.phrasal_verbs:
-            pv.asked = pv.rightCount = pv.wrongCount = pv.streak = 0
-            pv.category = PhrasalVerb.CATEGORY_AVERAGE
-        self.fileMang.savePhrasalVerbs(self.phrasal_verbs, self.phrasalVerbFileName)
-        
-        print(f"{bcolors.OKGREEN}All scores have been reset and previous data archived!{bcolors.ENDC}")
\ No newline at end of file
+        self.output(f"{bcolors.OKGREEN}All words and phrasal verbs have been recategorized!{bcolors.ENDC}")
@@ -0,0 +1,128 @@
+from Word import Word
+
+
+# The list of Words or PhrasalVerbs plus one bucket per category. Items report
+# category changes through their `category` setter, so the buckets are kept
+# current incrementally instead of being rebuilt by scanning the deck. A
+# spelling index (normalized text -> position) makes duplicate checks, lookup
+# and removal by spelling O(1). Items also report changes to their stats, so
+# the deck knows which items storage has yet to save (`dirty`) and has a
+# `generation` that moves on with every change, for caches built from it.
+class Deck:
+    def __init__(self, items=(), key="word") -> None:
+        self.key = key
+        self.items = []
+        self.index = {}
+        # category -> {item: None}, an insertion ordered set
+        self.buckets = {
+            Word.CATEGORY_STRUGGLING: {},
+            Word.CATEGORY_AVERAGE: {},
+            Word.CATEGORY_MASTERED: {},
+        }
+        # Items changed since storage last saved them, {item: None}
+        self.dirty = {}
+        # Items were replaced or removed, which only a full save can store
+        self.restructured = False
+        self.generation = 0
+        for item in items:
+            self.append(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    # Same normalization the Word and PhrasalVerb constructors apply
+    @staticmethod
+    def normalize(text):
+        return text.lower().strip()
+
+    def __contains__(self, text):
+        return self.normalize(text) in self.index
+
+    def find(self, text):
+        position = self.index.get(self.normalize(text))
+        return None if position is None else self.items[position]
+
+    # False (and nothing added) when an item with the same spelling exists
+    def append(self, item):
+        text = getattr(item, self.key)
+        if text in self.index:
+            return False
+        self.index[text] = len(self.items)
+        self.items.append(item)
+        item.deck = self
+        self.buckets.setdefault(item.category, {})[item] = None
+        if item.dirty:
+            self.dirty[item] = None
+        self.generation += 1
+        return True
+
+    # Put `item` in place of the item with the same spelling, or append it
+    def replace(self, item):
+        position = self.index.get(getattr(item, self.key))
+        if position is None:
+            return self.append(item)
+        old = self.items[position]
+        self.buckets.get(old.category, {}).pop(old, None)
+        self.dirty.pop(old, None)
+        old.deck = None
+        self.items[position] = item
+        item.deck = self
+        self.buckets.setdefault(item.category, {})[item] = None
+        self.restructured = True
+        self.generation += 1
+        return True
+
+    # The last item takes the removed item's slot, so deck order is not kept
+    def remove(self, text):
+        position = self.index.pop(self.normalize(text), None)
+        if position is None:
+            return None
+        item = self.items[position]
+        last = self.items.pop()
+        if last is not item:
+            self.items[position] = last
+            self.index[getattr(last, self.key)] = position
+        self.buckets.get(item.category, {}).pop(item, None)
+        self.dirty.pop(item, None)
+        item.deck = None
+        self.restructured = True
+        self.generation += 1
+        return item
+
+    def categoryChanged(self, item, old, new):
+        if old is not None:
+            self.buckets.get(old, {}).pop(item, None)
+        self.buckets.setdefault(new, {})[item] = None
+
+    # Called by items through markDirty
+    def itemChanged(self, item):
+        self.dirty[item] = None
+        self.generation += 1
+
+    # Something changed that storage already has, e.g. another process's answers
+    def touch(self):
+        self.generation += 1
+
+    # Storage saved `item`, or the whole deck when no item is given
+    def markClean(self, item=None):
+        if item is not None:
+            item.dirty = False
+            self.dirty.pop(item, None)
+            return
+        for item in self.dirty:
+            item.dirty = False
+        self.dirty.clear()
+        self.restructured = False
+
+    # Items currently in `category`, O(k) for a bucket of k items
+    def bucket(self, category):
+        return list(self.buckets.get(category, ()))
+
+    def count(self, category):
+        return len(self.buckets.get(category, ()))
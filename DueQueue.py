@@ -0,0 +1,56 @@
+import heapq
+from itertools import count
+
+
+# Items ordered by their next review time (dueAt). Only reviewed items are
+# queued; pulling the next due item looks at the head of a heap instead of
+# scanning the deck. Stale entries are skipped lazily like in Scheduler, and
+# so are items whose dueAt changed without update() (they are queued again).
+class DueQueue:
+    def __init__(self, items) -> None:
+        self.entries = {}
+        self.heap = []
+        # Tie-breakers for equal dueAt, never reused so items are never compared
+        self.counter = count()
+        for item in items:
+            if item.dueAt is not None:
+                entry = [item.dueAt, next(self.counter), item, True]
+                self.entries[item] = entry
+                self.heap.append(entry)
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def peek(self):
+        while self.heap:
+            dueAt, _, item, valid = self.heap[0]
+            if valid and item.dueAt == dueAt:
+                return item
+            heapq.heappop(self.heap)
+            if valid:
+                del self.entries[item]
+                if item.dueAt is not None:
+                    self.update(item)
+        return None
+
+    # Earliest item whose review is due at `now`, or None
+    def nextDue(self, now):
+        item = self.peek()
+        if item is None or item.dueAt > now:
+            return None
+        return item
+
+    # Call after an item was reviewed
+    def update(self, item):
+        old = self.entries.pop(item, None)
+        if old is not None:
+            old[3] = False
+        if item.dueAt is None:
+            return
+        entry = [item.dueAt, next(self.counter), item, True]
+        self.entries[item] = entry
+        heapq.heappush(self.heap, entry)
+        if len(self.heap) > 2 * len(self.entries) + 16:
+            self.heap = [e for e in self.heap if e[3]]
+            heapq.heapify(self.heap)
@@ -0,0 +1,97 @@
+import os
+import threading
+
+
+# Replaces `fileName` without ever leaving a truncated file behind: the data
+# goes to a temporary file in the same directory, is fsynced and then renamed
+# over the target, and the directory is fsynced so the rename survives a power
+# loss too. Readers see either the old or the new contents.
+def atomicWrite(fileName, data):
+    tempName = writeTemp(fileName, data)
+    try:
+        os.replace(tempName, fileName)
+    except OSError:
+        os.remove(tempName)
+        raise
+    syncDirectory(os.path.dirname(fileName) or ".")
+
+
+# First half of atomicWrite: `data` in a durable temporary file next to
+# `fileName`, named per process and thread. Returns the temporary file's name.
+def writeTemp(fileName, data):
+    tempName = f"{fileName}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tempName, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    except OSError:
+        if os.path.exists(tempName):
+            os.remove(tempName)
+        raise
+    return tempName
+
+
+def syncDirectory(directory):
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# Group commit for whole-file saves. write() only records the newest contents
+# of each file; `delay` seconds after the first pending request they are all
+# committed on a background thread by `write(fileName, data)`, which returns
+# False on failure, so a burst of saves costs one write and fsync per file.
+# schedule() queues other work for the same commit, like fsyncing a journal,
+# once per key.
+class GroupCommit:
+    def __init__(self, delay, write) -> None:
+        self.delay = delay
+        self.writeFile = write
+        # fileName -> data
+        self.pending = {}
+        # key -> action
+        self.actions = {}
+        self.pendingLock = threading.Lock()
+        # Commits happen one at a time, in submission order
+        self.commitLock = threading.Lock()
+        self.timer = None
+
+    def write(self, fileName, data):
+        with self.pendingLock:
+            self.pending[fileName] = data
+            self.startTimer()
+
+    def schedule(self, key, action):
+        with self.pendingLock:
+            self.actions[key] = action
+            self.startTimer()
+
+    def startTimer(self):
+        if self.timer is None:
+            self.timer = threading.Timer(self.delay, self.flush)
+            self.timer.start()
+
+    # Commit everything pending now; False if a write failed
+    def flush(self):
+        with self.commitLock:
+            with self.pendingLock:
+                pending, self.pending = self.pending, {}
+                actions, self.actions = self.actions, {}
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+            ok = True
+            for fileName, data in pending.items():
+                if not self.writeFile(fileName, data):
+                    ok = False
+            for action in actions.values():
+                action()
+            return ok
+
+    def close(self):
+        return self.flush()
@@ -0,0 +1,40 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: only the threads of one process are kept apart
+    fcntl = None
+
+
+# Advisory lock shared by every process using the same data directory
+# (flock on a lock file), re-entrant within a thread and exclusive between the
+# threads of one process. Used as a context manager.
+class FileLock:
+    def __init__(self, fileName) -> None:
+        self.fileName = fileName
+        self.threadLock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+    def __enter__(self):
+        self.threadLock.acquire()
+        if self.depth == 0 and fcntl is not None:
+            if self.fd is None:
+                self.fd = os.open(self.fileName, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self.depth -= 1
+        if self.depth == 0 and fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.threadLock.release()
+
+    def close(self):
+        with self.threadLock:
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
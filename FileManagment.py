@@ -1,108 +1,500 @@
 
 from datetime import datetime
 import json
-from distutils.log import error
 from Word import Word
 from PhrasalVerb import PhrasalVerb
+from Journal import Journal
+from Deck import Deck
+from DurableWriter import GroupCommit, writeTemp, syncDirectory
+import Snapshot
+from Storage import StorageBackend
+from Instrumentation import timed
+from FileLock import FileLock
+import functools
 import os
+import uuid
 
-class FileManagement:
-    def __init__(self) -> None:
-        self.wordsFileName="data/words.json"
-        self.phrasalVerbFileName="data/phrasal_verbs.json"
+# Counters merged as deltas, in the order of unsyncedCounts()
+COUNTERS = ("rightCount", "wrongCount", "asked")
+
+
+# GroupCommit write function: saves are handed over as ready-to-run commits
+def runCommit(fileName, commit):
+    return commit()
+
+
+# One deck's files and what this session knows about them
+class DeckFiles:
+    # Fields other than the counters; stored state replaces ours for these
+    FIELDS = ("streak", "difficulty", "category", "ease", "interval", "repetitions", "dueAt")
+
+    def __init__(self, fileName, journal, cls, key, fromDict, indent=None) -> None:
+        self.fileName = fileName
+        self.journal = journal
+        self.cls = cls
+        self.key = key
+        self.fromDict = fromDict
+        self.indent = indent
+        # (inode, mtime, size) of the deck file our items reflect
+        self.version = None
+        # Journal bytes our items reflect
+        self.offset = 0
+        # Counter deltas of saves not committed yet, text -> [right, wrong, asked]
+        self.pendingDeltas = {}
+        # The next commit replaces the stored deck instead of merging into it
+        self.override = False
+        # A commit merged in other processes' changes that our items lack
+        self.stale = False
+        # Records appended since the last save was handed to the commit
+        self.unsaved = 0
+
+    def currentVersion(self):
+        try:
+            stat = os.stat(self.fileName)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class FileManagement(StorageBackend):
+    # Fold the answer journal into a new snapshot after this many records
+    COMPACT_AFTER = 500
+    # Saves within this many seconds are committed together
+    COMMIT_DELAY = 0.05
+
+    # `directory` holds the decks, journals and lock file. `writer` is the
+    # GroupCommit to hand saves to; several instances can share one (see
+    # PracticeServer.py), by default each gets its own.
+    def __init__(self, directory="data", writer=None) -> None:
+        self.directory = directory
+        self.wordsFileName=f"{directory}/words.json"
+        self.phrasalVerbFileName=f"{directory}/phrasal_verbs.json"
+        self.wordsJournal = Journal(f"{directory}/words.journal")
+        self.phrasalVerbsJournal = Journal(f"{directory}/phrasal_verbs.journal")
+        self.words = Deck(key="word")
+        self.phrasal_verbs = Deck(key="phrasal_verb")
+        # Held around every read and write of the data directory, by this
+        # process's threads and by other processes sharing the directory
+        self.lock = FileLock(f"{directory}/.lock")
+        # Tells our journal records apart from other processes'
+        self.writerId = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.wordFiles = DeckFiles(self.wordsFileName, self.wordsJournal, Word, "word", self.wordFromDict)
+        self.phrasalVerbFiles = DeckFiles(self.phrasalVerbFileName, self.phrasalVerbsJournal, PhrasalVerb, "phrasal_verb", self.phrasalVerbFromDict, indent=4)
+        self.writer = writer or GroupCommit(self.COMMIT_DELAY, runCommit)
         
-        if not os.path.exists("data"):
-            os.makedirs("data")
+        if not os.path.exists(directory):
+            os.makedirs(directory)
         
-    def writeInFile(self, data, fileName):
-        try:
-            # Writing to sample.json
-            with open(fileName, "w") as outfile:
-                outfile.write(data)
+    # Hands the deck to the group commit. Counter changes since the last sync
+    # travel as deltas (added up over superseded saves) so the commit can merge
+    # them into whatever other processes stored in the meantime.
+    def saveDeck(self, items, files, snapshot=True, override=False):
+        with self.lock:
+            states = []
+            for item in items:
+                delta = item.unsyncedCounts()
+                if any(delta):
+                    text = getattr(item, files.key)
+                    pending = files.pendingDeltas.get(text)
+                    files.pendingDeltas[text] = delta if pending is None else [a + b for a, b in zip(pending, delta)]
+                    item.markSynced()
+                states.append(item.toDict())
+            if isinstance(items, Deck):
+                items.markClean()
+            else:
+                for item in items:
+                    item.markClean()
+            files.override = files.override or override
+            files.unsaved = 0
+            # When our items reflect the whole stored deck, `states` is that
+            # deck plus our changes: the commit can write it without reading
+            # the file back, unless someone else commits first
+            basis = None
+            if not files.stale and files.currentVersion() == files.version and files.journal.size() == files.offset:
+                basis = (files.version, files.offset)
+            pickled = Snapshot.dumps(items) if snapshot and isinstance(items, Deck) else None
+        self.writer.write(files.fileName, functools.partial(self.commitDeck, files, states, pickled, basis))
+
+    # Runs on the commit thread: merge our deck into the stored one, write it
+    # and drop the journal records it now contains. The lock is only held to
+    # read the stored deck and to swap the new file in; if another process
+    # committed in between, the merge starts over.
+    @timed("storage.commitDeck")
+    def commitDeck(self, files, states, pickled, basis):
+        with self.lock:
+            deltas, files.pendingDeltas = files.pendingDeltas, {}
+            override, files.override = files.override, False
+        while True:
+            with self.lock:
+                version = files.currentVersion()
+                journalId = files.journal.id()
+                if override:
+                    # Everything stored so far is replaced
+                    raw, offset = None, files.journal.size()
+                elif basis is not None and basis[0] == version:
+                    raw, offset = None, basis[1]
+                else:
+                    raw, journalData = self.readRaw(files)
+            if raw is None:
+                merged, exact, foreign = states, True, False
+            else:
+                stored, offset, foreign = self.parseStored(files, raw, journalId, journalData, version)
+                merged, exact = self.mergeStored(files, states, stored, deltas)
+            # The journal records up to `offset` are in `merged` now
+            data = self.dumpDeckFile(merged, (journalId, offset), files.indent)
+            try:
+                tempName = writeTemp(files.fileName, data)
+            except OSError as e:
+                print(f"Could not save {files.fileName}: {e}")
+                self.keepDeltas(files, deltas, override)
+                return False
+            with self.lock:
+                if files.journal.id() != journalId or (not override and files.currentVersion() != version):
+                    os.remove(tempName)
+                    basis = None
+                    continue
+                os.replace(tempName, files.fileName)
+                # Written before anyone else can replace the deck file again
+                if pickled is not None and exact:
+                    Snapshot.write(files.fileName, pickled, files.cls, data.encode(), (journalId, offset))
+                files.journal.dropBefore(offset)
+                files.version = files.currentVersion()
+                # Records added while we merged stay in the journal; our items
+                # have our own, other processes' are picked up by a resync
+                tail, files.offset = files.journal.read()
+                # Our own answers since the save are in the file and in our
+                # items already; only other processes' changes call for a resync
+                files.stale = files.stale or foreign or any(record.get("writer") != self.writerId for record in tail)
+            syncDirectory(os.path.dirname(files.fileName) or ".")
             return True
-        except (error):
-            print(error)
-            return False
 
-    def arryOfWordsToJson(self, words):
-        return json.dumps([word.__dict__ for word in words]
-                        # , indent=4
-                          )
+    # A failed commit's deltas go to the next one
+    def keepDeltas(self, files, deltas, override):
+        with self.lock:
+            for text, delta in files.pendingDeltas.items():
+                deltas[text] = [a + b for a, b in zip(deltas.get(text, (0, 0, 0)), delta)]
+            files.pendingDeltas = deltas
+            files.override = files.override or override
 
+    # Our states with the stored counters plus our deltas, then the items only
+    # other processes know about. Also whether that is exactly `states`.
+    def mergeStored(self, files, states, stored, deltas):
+        stored = dict(stored)
+        merged = []
+        exact = True
+        for state in states:
+            old = stored.pop(state[files.key], None)
+            if old is not None:
+                delta = deltas.get(state[files.key], (0, 0, 0))
+                counts = [old.get(counter, 0) + change for counter, change in zip(COUNTERS, delta)]
+                if counts != [state[counter] for counter in COUNTERS]:
+                    exact = False
+                    state = dict(state)
+                    state.update(zip(COUNTERS, counts))
+            merged.append(state)
+        if stored:
+            exact = False
+            merged.extend(stored.values())
+        return merged, exact
+
+    # The stored deck as {text: state}: the deck file plus the journal. Also
+    # returns the journal offset it reflects and whether other processes
+    # changed anything since we last read or wrote the deck file.
+    def readStored(self, files):
+        version = files.currentVersion()
+        journalId = files.journal.id()
+        raw, journalData = self.readRaw(files)
+        return self.parseStored(files, raw, journalId, journalData, version)
+
+    # The deck file's and the journal's bytes. Call with the lock held;
+    # parsing can happen after it is released.
+    def readRaw(self, files):
+        try:
+            with open(files.fileName, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b"[]"
+        return raw, files.journal.contents()[1]
+
+    # The deck file holds the items and the journal's high-water mark,
+    # {"journal": [id, offset], "items": [...]}: the records up to that offset
+    # of the journal with that id are already counted in the items
+    @staticmethod
+    def dumpDeckFile(states, mark, indent=None):
+        return json.dumps({"journal": list(mark), "items": states}, indent=indent)
+
+    # (states, mark) of a deck file; a plain list of states has no mark
+    @staticmethod
+    def parseDeckFile(raw):
+        data = json.loads(raw)
+        if isinstance(data, list):
+            return data, None
+        mark = data.get("journal")
+        return data["items"], tuple(mark) if mark else None
+
+    # (stored, journal end offset, foreign) from readRaw's bytes
+    def parseStored(self, files, raw, journalId, journalData, version):
+        stored = {}
+        foreign = version != files.version
+        mark = None
+        try:
+            states, mark = self.parseDeckFile(raw)
+            for state in states:
+                stored[state[files.key]] = state
+        except json.JSONDecodeError:
+            pass
+        records, offset = Journal.parse(journalData, Journal.replayFrom(mark, journalId))
+        for record in records:
+            delta = record.pop("delta")
+            if record.pop("writer", None) != self.writerId:
+                foreign = True
+            old = stored.get(record[files.key])
+            if old is not None:
+                for counter, change in zip(COUNTERS, delta):
+                    record[counter] = old.get(counter, 0) + change
+            stored[record[files.key]] = record
+        return stored, offset, foreign
+
+    # Stores what changed since the last save. For the loaded deck that is a
+    # journal record per dirty item, as long as that's cheaper than rewriting
+    # the deck file. Other item lists, decks with replaced or removed items and
+    # decks that have no file yet are saved whole.
+    def saveChanges(self, items, loaded, files):
+        with self.lock:
+            if (items is not loaded or items.restructured or files.version is None
+                    or len(items.dirty) + files.unsaved >= self.COMPACT_AFTER):
+                return self.saveDeck(items, files)
+            for item in list(items.dirty):
+                self.record(item, items, files)
+
+    @timed("storage.saveWords")
     def saveWords(self, words):
-        self.writeInFile(self.arryOfWordsToJson(words), self.wordsFileName)
+        self.saveChanges(words, self.words, self.wordFiles)
 
-    def readWordsFromJson(self):
-        words = []
+    # Per-answer persistence: one journal record instead of rewriting the deck.
+    # The record is fsynced with the next group commit.
+    @timed("storage.recordWord")
+    def recordWord(self, word):
+        self.record(word, self.words, self.wordFiles)
+
+    @timed("storage.recordPhrasalVerb")
+    def recordPhrasalVerb(self, phrasal_verb):
+        self.record(phrasal_verb, self.phrasal_verbs, self.phrasalVerbFiles)
+
+    def record(self, item, items, files):
+        with self.lock:
+            record = item.toDict()
+            record["delta"] = item.unsyncedCounts()
+            record["writer"] = self.writerId
+            item.markSynced()
+            item.markClean()
+            start, end = files.journal.append(record)
+            # Nobody else appended since we last looked, no need to read it back
+            if start == files.offset:
+                files.offset = end
+            files.unsaved += 1
+            self.writer.schedule(files.journal.fileName, lambda: self.syncJournal(files.journal))
+            # Compaction is an ordinary save of the whole deck, minus the snapshot
+            if files.unsaved >= self.COMPACT_AFTER:
+                self.saveDeck(items, files, snapshot=False)
+
+    # fsync a duplicate of the journal's descriptor, so appends don't wait
+    # for the disk
+    def syncJournal(self, journal):
+        with self.lock:
+            if journal.file is None:
+                return
+            fd = os.dup(journal.file.fileno())
         try:
-            with open(self.wordsFileName, "r") as f:
-                data = json.load(f)
-                for wordData in data:
-                    word = Word(
-                        wordData["word"],
-                        wordData.get("rightCount", 0),
-                        wordData.get("wrongCount", 0),
-                        wordData.get("asked", 0),
-                        wordData.get("streak", 0),
-                        wordData.get("difficulty"),
-                        wordData.get("category")
-                    )
-                    words.append(word)
-        except (FileNotFoundError, json.JSONDecodeError):
-            print(f"No existing file found at {self.wordsFileName} or invalid JSON. Starting with empty word list.")
-        return words
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # Commit pending saves now
+    def flush(self):
+        return self.writer.flush()
+
+    def wordFromDict(self, wordData):
+        return Word(
+            wordData["word"],
+            wordData.get("rightCount", 0),
+            wordData.get("wrongCount", 0),
+            wordData.get("asked", 0),
+            wordData.get("streak", 0),
+            wordData.get("difficulty"),
+            wordData.get("category"),
+            wordData.get("ease"),
+            wordData.get("interval", 0),
+            wordData.get("repetitions", 0),
+            wordData.get("dueAt")
+        )
+
+    def phrasalVerbFromDict(self, pvData):
+        return PhrasalVerb(
+            pvData["phrasal_verb"],
+            pvData.get("rightCount", 0),
+            pvData.get("wrongCount", 0),
+            pvData.get("asked", 0),
+            pvData.get("streak", 0),
+            pvData.get("difficulty"),
+            pvData.get("category"),
+            pvData.get("ease"),
+            pvData.get("interval", 0),
+            pvData.get("repetitions", 0),
+            pvData.get("dueAt")
+        )
+
+    # Apply one stored record to the deck: deltas are added to the counters,
+    # the other fields are taken over. Returns the item.
+    def applyRecord(self, deck, record, files):
+        item = deck.find(record[files.key])
+        if item is None:
+            item = files.fromDict(record)
+            deck.append(item)
+            item.markClean()
+        else:
+            item.addStoredCounts(*record["delta"])
+            self.applyFields(item, record)
+        return item
+
+    # Storage has these values already, so a clean item stays clean
+    def applyFields(self, item, state):
+        dirty = item.dirty
+        for field in DeckFiles.FIELDS:
+            if field in state:
+                setattr(item, field, state[field])
+        if not dirty:
+            item.markClean()
+
+    # Apply journal records on top of the loaded snapshot
+    def replayJournal(self, records, deck, files):
+        for record in records:
+            self.applyRecord(deck, record, files)
+        return deck
+
+    def readDeck(self, files):
+        self.flush()
+        with self.lock:
+            deck, mark = Snapshot.read(files.fileName, files.cls)
+            if deck is None:
+                deck = Deck(key=files.key)
+                try:
+                    with open(files.fileName, "rb") as f:
+                        raw = f.read()
+                    states, mark = self.parseDeckFile(raw)
+                    for data in states:
+                        deck.append(files.fromDict(data))
+                    deck.markClean()
+                    Snapshot.write(files.fileName, Snapshot.dumps(deck), files.cls, raw, mark)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    print(f"No existing file found at {files.fileName} or invalid JSON. Starting with an empty list.")
+            files.version = files.currentVersion()
+            records, files.offset = files.journal.replay(mark)
+            files.stale = False
+            self.replayJournal(records, deck, files)
+            deck.markClean()
+            return deck
+
+    @timed("storage.readWords")
+    def readWordsFromJson(self):
+        self.words = self.readDeck(self.wordFiles)
+        return self.words
     
+    @timed("storage.readPhrasalVerbs")
     def readPhrasalVerbsFromJson(self):
-        phrasal_verbs = []
-        try:
-            with open(self.phrasalVerbFileName, "r") as f:
-                data = json.load(f)
-                for pvData in data:
-                    pv = PhrasalVerb(
-                        pvData["phrasal_verb"],
-                        pvData.get("rightCount", 0),
-                        pvData.get("wrongCount", 0),
-                        pvData.get("asked", 0),
-                        pvData.get("streak", 0),
-                        pvData.get("difficulty"),
-                        pvData.get("category")
-                    )
-                    phrasal_verbs.append(pv)
-        except (FileNotFoundError, json.JSONDecodeError):
-            print(f"No existing file found at {self.phrasalVerbFileName} or invalid JSON. Starting with empty phrasal verb list.")
-        return phrasal_verbs
+        self.phrasal_verbs = self.readDeck(self.phrasalVerbFiles)
+        return self.phrasal_verbs
 
+    @timed("storage.savePhrasalVerbs")
     def savePhrasalVerbs(self, phrasal_verbs):
-        data = []
-        for pv in phrasal_verbs:
-            pvData = {
-                "phrasal_verb": pv.phrasal_verb,
-                "rightCount": pv.rightCount,
-                "wrongCount": pv.wrongCount,
-                "asked": pv.asked,
-                "streak": pv.streak,
-                "difficulty": pv.difficulty,
-                "category": pv.category
-            }
-            data.append(pvData)
-        with open(self.phrasalVerbFileName, "w") as f:
-            json.dump(data, f, indent=4)
-            
-    def resetScore(self, fileName, type):
-        # Archive and reset words
-        words_archive_name = f"data/Archive-{type}-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
-        if os.path.exists(fileName):
-            os.rename(fileName, words_archive_name)
-        for word in self.words:
-            word.asked = word.rightCount = word.wrongCount = word.streak = 0
-            word.category = Word.CATEGORY_AVERAGE
-        self.fileMang.saveWords(self.words, fileName)
+        self.saveChanges(phrasal_verbs, self.phrasal_verbs, self.phrasalVerbFiles)
+
+    # Bring the loaded decks up to date with what other processes stored.
+    # Cheap when nothing changed: one stat of the deck file and the journal.
+    @timed("storage.refresh")
+    def refresh(self):
+        return self.refreshDeck(self.words, self.wordFiles) + self.refreshDeck(self.phrasal_verbs, self.phrasalVerbFiles)
+
+    # The items of `deck` that changed
+    def refreshDeck(self, deck, files):
+        # Unlocked first look: a change that lands right after it is seen on
+        # the next call
+        if not files.stale and files.currentVersion() == files.version and files.journal.size() == files.offset:
+            return []
+        with self.lock:
+            if files.stale or files.currentVersion() != files.version:
+                return self.resync(deck, files)
+            if files.journal.size() == files.offset:
+                return []
+            records, files.offset = files.journal.read(files.offset)
+            changed = {}
+            for record in records:
+                if record.get("writer") != self.writerId:
+                    item = self.applyRecord(deck, record, files)
+                    changed[id(item)] = item
+            return list(changed.values())
+
+    # The deck file was replaced: compare every item with the stored state.
+    # What storage holds beyond our synced counters (and our saves still
+    # waiting for the commit) came from elsewhere and is added to ours.
+    def resync(self, deck, files):
+        stored, files.offset, _ = self.readStored(files)
+        files.version = files.currentVersion()
+        files.stale = False
+        changed = []
+        for text, state in stored.items():
+            item = deck.find(text)
+            if item is None:
+                item = files.fromDict(state)
+                deck.append(item)
+                item.markClean()
+                changed.append(item)
+                continue
+            pending = files.pendingDeltas.get(text, (0, 0, 0))
+            synced = (item.syncedRight, item.syncedWrong, item.syncedAsked)
+            diff = [state.get(counter, 0) + change - old for counter, change, old in zip(COUNTERS, pending, synced)]
+            if any(diff):
+                item.addStoredCounts(*diff)
+                self.applyFields(item, state)
+                changed.append(item)
+        return changed
+
+    def readWords(self):
+        return self.readWordsFromJson()
+
+    def readPhrasalVerbs(self):
+        return self.readPhrasalVerbsFromJson()
+
+    def resetScore(self, files, type, items):
+        # Archive the current scores (journal and other processes included),
+        # then reset them in place
+        self.saveDeck(items, files)
+        self.flush()
+        archive_name = f"{self.directory}/Archive-{type}-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+        with self.lock:
+            # Items only other processes had are archived and reset too
+            self.refreshDeck(items, files)
+            if os.path.exists(files.fileName):
+                os.rename(files.fileName, archive_name)
+        for item in items:
+            item.asked = item.rightCount = item.wrongCount = item.streak = 0
+            item.category = Word.CATEGORY_AVERAGE
+            item.ease, item.interval, item.repetitions, item.dueAt = item.DEFAULT_EASE, 0, 0, None
+            item.markSynced()
+            item.markDirty()
+        # Replaces the stored deck: other processes pick up the reset on refresh
+        self.saveDeck(items, files, override=True)
     
+    # Commits pending saves, then closes the journals
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.wordsJournal.close()
+            self.phrasalVerbsJournal.close()
+        self.lock.close()
+
     def resetWordScore(self):
-        self.resetScore(self.wordsFileName, "Words")
+        self.resetScore(self.wordFiles, "Words", self.words)
     
     def resetPhrasalVerbScore(self):
-        self.resetScore(self.phrasalVerbFileName, "PhrasalVerbs")
-    
-
-    
+        self.resetScore(self.phrasalVerbFiles, "PhrasalVerbs", self.phrasal_verbs)
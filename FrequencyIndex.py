@@ -0,0 +1,151 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+
+# On-disk layout (little endian):
+#   header  : magic, version, number of entries, size of the string blob
+#   offsets : (count + 1) uint32 offsets into the blob, one per entry plus the end
+#   counts  : count uint32 usage frequencies
+#   blob    : utf-8 encoded words, sorted by their encoded bytes
+HEADER = struct.Struct("<4sIII")
+MAGIC = b"WFIX"
+VERSION = 1
+UINT = struct.Struct("<I")
+
+DEFAULT_INDEX_FILE = "data/word_frequency.idx"
+
+
+class FrequencyIndex:
+    def __init__(self, fileName=DEFAULT_INDEX_FILE) -> None:
+        self.fileName = fileName
+        with open(fileName, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, blobSize = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{fileName} is not a word frequency index")
+        self.offsetsStart = HEADER.size
+        self.countsStart = self.offsetsStart + (self.count + 1) * UINT.size
+        self.blobStart = self.countsStart + self.count * UINT.size
+
+    def _offset(self, i):
+        return UINT.unpack_from(self.buffer, self.offsetsStart + i * UINT.size)[0]
+
+    def _key(self, i):
+        return self.buffer[self.blobStart + self._offset(i):self.blobStart + self._offset(i + 1)]
+
+    # Binary search over the sorted blob, returns None for unknown words
+    def frequency(self, word):
+        key = word.lower().strip().encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._key(low) == key:
+            return UINT.unpack_from(self.buffer, self.countsStart + low * UINT.size)[0]
+        return None
+
+    def __contains__(self, word):
+        return self.frequency(word) is not None
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.buffer.close()
+
+    @staticmethod
+    def write(frequencies, fileName=DEFAULT_INDEX_FILE):
+        entries = sorted((word.encode("utf-8"), count) for word, count in frequencies.items())
+        offsets = [0]
+        for key, _ in entries:
+            offsets.append(offsets[-1] + len(key))
+        directory = os.path.dirname(fileName)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        # Named per process and thread: several may build the index at once
+        tempName = f"{fileName}.{os.getpid()}-{threading.get_ident()}.tmp"
+        with open(tempName, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(entries), offsets[-1]))
+            f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            f.write(struct.pack(f"<{len(entries)}I", *(min(count, 0xFFFFFFFF) for _, count in entries)))
+            f.write(b"".join(key for key, _ in entries))
+        os.replace(tempName, fileName)
+
+
+NLTK_DATA_DIR = "data/nltk_data"
+
+
+# Usage counts from the Brown corpus, plus every entry of the NLTK `words`
+# list so dictionary words that never occur in running text still count as known.
+# Corpora are read from the local cache; the network is only used with download=True.
+def corpusFrequencies(download=False):
+    import nltk
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    if download:
+        nltk.download("words", download_dir=NLTK_DATA_DIR, quiet=True)
+        nltk.download("brown", download_dir=NLTK_DATA_DIR, quiet=True)
+    from nltk.corpus import brown, words as corpus_words
+
+    frequencies = {}
+    for word in corpus_words.words():
+        frequencies.setdefault(word.lower(), 0)
+    for token in brown.words():
+        if token.isalpha():
+            token = token.lower()
+            frequencies[token] = frequencies.get(token, 0) + 1
+    return frequencies
+
+
+# Reads a "word count" (or "word,count") per line frequency list
+def fileFrequencies(fileName):
+    frequencies = {}
+    with open(fileName, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.replace(",", " ").split()
+            if len(parts) < 2 or not parts[-1].isdigit():
+                continue
+            word = " ".join(parts[:-1]).lower()
+            frequencies[word] = frequencies.get(word, 0) + int(parts[-1])
+    return frequencies
+
+
+def buildIndex(source=None, fileName=DEFAULT_INDEX_FILE, download=False):
+    frequencies = fileFrequencies(source) if source else corpusFrequencies(download)
+    FrequencyIndex.write(frequencies, fileName)
+    return len(frequencies)
+
+
+class EmptyIndex:
+    def frequency(self, word):
+        return None
+
+
+_sharedIndex = None
+
+
+# Shared instance, built from the locally cached corpus the first time it's needed
+def getFrequencyIndex():
+    global _sharedIndex
+    if _sharedIndex is None:
+        try:
+            if not os.path.exists(DEFAULT_INDEX_FILE):
+                buildIndex()
+            _sharedIndex = FrequencyIndex(DEFAULT_INDEX_FILE)
+        except LookupError:
+            print(f"No word frequency index at {DEFAULT_INDEX_FILE} and no local NLTK corpus to build it from. "
+                  "Run `python3 FrequencyIndex.py --download` once; treating every word as rare until then.")
+            _sharedIndex = EmptyIndex()
+    return _sharedIndex
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--download"]
+    source = args[0] if args else None
+    count = buildIndex(source, download="--download" in sys.argv)
+    print(f"Wrote {count} entries to {DEFAULT_INDEX_FILE}")
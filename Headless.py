@@ -0,0 +1,78 @@
+import random
+from AudioPipeline import AudioPipeline
+from Brain import Management
+from Scheduler import Scheduler
+from TextToSpeech import RecordingTTS
+
+# Run Management without a terminal or speakers: answers come from a scripted
+# input source or a simulated learner, output is discarded and speech is
+# recorded instead of played.
+
+SPELL_PROMPT = "Spell the"
+
+
+# Feeds input() from a list of answers, then presses Ctrl-C
+class ScriptedInput:
+    def __init__(self, answers) -> None:
+        self.answers = iter(answers)
+
+    def __call__(self, prompt=""):
+        answer = next(self.answers, None)
+        if answer is None:
+            raise KeyboardInterrupt
+        return answer
+
+
+# Answers spelling prompts for whatever the speech engine said last. An item is
+# spelled right with probability `accuracy`, plus `learningRate` for every time
+# it was already asked (kept within 0.01-0.99 so every turn ends). Any other
+# prompt goes to `otherwise`, which presses Ctrl-C by default.
+class SimulatedLearner:
+    def __init__(self, speech, accuracy=0.8, learningRate=0.0, rng=None, otherwise=None) -> None:
+        self.speech = speech
+        self.accuracy = accuracy
+        self.learningRate = learningRate
+        self.rng = rng if rng is not None else random.Random()
+        self.otherwise = otherwise
+        self.asked = {}
+
+    def __call__(self, prompt=""):
+        if not prompt.startswith(SPELL_PROMPT):
+            if self.otherwise is None:
+                raise KeyboardInterrupt
+            return self.otherwise(prompt)
+        text = self.speech.lastWord
+        asked = self.asked.get(text, 0)
+        self.asked[text] = asked + 1
+        if self.rng.random() < max(min(self.accuracy + self.learningRate * asked, 0.99), 0.01):
+            return text
+        # A near miss: drop the last letter
+        return text[:-1]
+
+
+def discard(*args, **kwargs):
+    pass
+
+
+# Management wired to a RecordingTTS (which keeps only the last `speechLimit`
+# texts) and a SimulatedLearner; `storage` defaults to STORAGE_BACKEND as usual
+def headlessManagement(storage=None, accuracy=0.8, learningRate=0.0, seed=None, output=discard, speechLimit=1):
+    speech = RecordingTTS(limit=speechLimit)
+    learner = SimulatedLearner(speech, accuracy, learningRate, random.Random(seed))
+    management = Management(storage, AudioPipeline(speech), learner, output)
+    if seed is not None:
+        management.rng = random.Random(seed)
+    return management
+
+
+# Runs `turns` practice turns over the whole deck through wordTurn /
+# phrasalVerbTurn, the same step wordLoop and phrasalVerbLoop take. `onTurn`
+# is called with each answered item.
+def runTurns(management, turns, phrasalVerbs=False, onTurn=None):
+    items = management.phrasal_verbs if phrasalVerbs else management.words
+    turn = management.phrasalVerbTurn if phrasalVerbs else management.wordTurn
+    scheduler = Scheduler(items, management.rng)
+    for _ in range(turns):
+        item = turn(scheduler)
+        if onTurn is not None:
+            onTurn(item)
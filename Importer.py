@@ -0,0 +1,117 @@
+import argparse
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from Word import Word
+from PhrasalVerb import PhrasalVerb
+from Storage import createStorage
+from FrequencyIndex import getFrequencyIndex
+
+BATCH_SIZE = 2000
+
+
+# Streams normalized entries out of a .txt (one per line), .csv (a "word" /
+# "phrasal_verb" column, else the first column) or .jsonl (strings or objects) file
+def readEntries(fileName, key):
+    extension = os.path.splitext(fileName)[1].lower()
+    with open(fileName, "r", encoding="utf-8", newline="") as f:
+        if extension == ".csv":
+            rows = csv.reader(f)
+            header = next(rows, [])
+            column = header.index(key) if key in header else 0
+            if key not in header and header:
+                yield header[0]
+            for row in rows:
+                if len(row) > column:
+                    yield row[column]
+        elif extension in (".jsonl", ".ndjson"):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                yield record.get(key, "") if isinstance(record, dict) else str(record)
+        else:
+            for line in f:
+                yield line
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# Runs in the worker processes
+def scoreBatch(cls, texts):
+    return [(text, cls(text).difficulty) for text in texts]
+
+
+# Adds every new entry of `fileName` to the deck with a single save at the end.
+# At most two batches per worker are scored or waiting at any time, so memory
+# stays flat however long the file is.
+def importFile(fileName, phrasalVerbs=False, storage=None, processes=None):
+    ownStorage = storage is None
+    storage = storage or createStorage()
+    try:
+        cls, key = (PhrasalVerb, "phrasal_verb") if phrasalVerbs else (Word, "word")
+        items = storage.readPhrasalVerbs() if phrasalVerbs else storage.readWords()
+        # Spellings seen in the file so far; the deck's own index covers saved items
+        known = set()
+
+        def newEntries():
+            for entry in readEntries(fileName, key):
+                text = entry.lower().strip()
+                if text and text not in known and text not in items:
+                    known.add(text)
+                    yield text
+
+        def addScored(future):
+            scored = future.result()
+            for text, difficulty in scored:
+                items.append(cls(text, difficulty=difficulty))
+            return len(scored)
+
+        start = time.perf_counter()
+        added = 0
+        # Word difficulty needs the frequency index: build it once here, not in
+        # every worker
+        if not phrasalVerbs:
+            getFrequencyIndex()
+        workers = processes or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers) as executor:
+            inFlight = deque()
+            for batch in batches(newEntries(), BATCH_SIZE):
+                inFlight.append(executor.submit(scoreBatch, cls, batch))
+                if len(inFlight) >= 2 * workers:
+                    added += addScored(inFlight.popleft())
+            while inFlight:
+                added += addScored(inFlight.popleft())
+
+        if added:
+            if phrasalVerbs:
+                storage.savePhrasalVerbs(items)
+            else:
+                storage.saveWords(items)
+        return added, time.perf_counter() - start
+    finally:
+        if ownStorage:
+            storage.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a word list (.txt, .csv or .jsonl) into the deck")
+    parser.add_argument("file")
+    parser.add_argument("--phrasal-verbs", action="store_true", help="import into the phrasal verbs deck")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    added, elapsed = importFile(args.file, args.phrasal_verbs, processes=args.processes)
+    print(f"Imported {added} new entries in {elapsed:.1f}s")
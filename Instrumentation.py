@@ -0,0 +1,127 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# Opt-in timing of the hot paths. INSTRUMENT=1 times every function decorated
+# with @timed and writes a per-session histogram to INSTRUMENT_DIR when the
+# process exits; PROFILE=1 runs the whole session under cProfile. Both are read
+# once at import: when they are off, @timed returns the function unchanged, so
+# there is nothing to pay.
+ENABLED = bool(os.getenv("INSTRUMENT"))
+PROFILE = bool(os.getenv("PROFILE"))
+OUTPUT_DIR = os.getenv("INSTRUMENT_DIR", "data/instrumentation")
+
+
+# Call count, total and a log2 histogram of durations in microseconds (bucket b
+# holds durations below 2**b us), so memory stays constant however long the session
+class Timer:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    # Upper bound of the bucket holding the given fraction of calls, in seconds
+    def percentile(self, fraction):
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= fraction * self.count:
+                return min(2 ** bucket / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+            "histogram": {f"<{2 ** bucket}us": count for bucket, count in sorted(self.buckets.items())},
+        }
+
+
+timers = {}
+lock = threading.Lock()
+
+
+def record(name, seconds):
+    with lock:
+        timer = timers.get(name)
+        if timer is None:
+            timer = timers[name] = Timer()
+        timer.add(seconds)
+
+
+def timed(name):
+    def decorator(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# For callables that aren't defined here, e.g. the input function
+def wrap(name, function):
+    return timed(name)(function)
+
+
+def summary():
+    with lock:
+        return {name: timer.summary() for name, timer in sorted(timers.items())}
+
+
+def outputFile(prefix, extension):
+    if not os.path.exists(OUTPUT_DIR):
+        os.makedirs(OUTPUT_DIR)
+    return os.path.join(OUTPUT_DIR, f"{prefix}-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}{extension}")
+
+
+def dump(fileName=None):
+    data = summary()
+    if not data:
+        return None
+    fileName = fileName or outputFile("session", ".json")
+    with open(fileName, "w") as f:
+        json.dump(data, f, indent=4)
+    return fileName
+
+
+# Profile everything from now until the process exits; read the result with
+# `python3 -m pstats <file>`
+def startProfiler():
+    import cProfile
+    profiler = cProfile.Profile()
+
+    def stop():
+        profiler.disable()
+        profiler.dump_stats(outputFile("profile", ".prof"))
+
+    atexit.register(stop)
+    profiler.enable()
+    return profiler
+
+
+if ENABLED:
+    atexit.register(dump)
@@ -0,0 +1,158 @@
+import json
+import os
+import uuid
+
+
+# Append-only log of answers, shared by every process using the data
+# directory. Each record is the full state of one item plus "delta", the
+# [right, wrong, asked] counts it adds, and "writer", the session that wrote
+# it. Replaying adds the deltas, so answers two processes gave to the same
+# item add up, and takes the other fields from the latest record. Callers hold
+# the data directory's FileLock around append, read and discard.
+#
+# The first line of each journal file is a header, {"journal": <id>}, with an
+# id that is new whenever the file is created or rewritten. A deck file
+# records (id, offset) of the journal records it already contains, so replay
+# can skip them even if a crash left them in the journal.
+class Journal:
+    def __init__(self, fileName) -> None:
+        self.fileName = fileName
+        self.file = None
+
+    def _open(self):
+        if self.file is not None and not self._isCurrent():
+            # Another process folded the journal into the deck and removed it
+            self.file.close()
+            self.file = None
+        if self.file is None:
+            torn = False
+            if os.path.exists(self.fileName) and os.path.getsize(self.fileName) > 0:
+                with open(self.fileName, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            self.file = open(self.fileName, "a", encoding="utf-8")
+            # Terminate a torn last line so the next record starts cleanly
+            if torn:
+                self.file.write("\n")
+            elif os.fstat(self.file.fileno()).st_size == 0:
+                self.file.write(self.header())
+        return self.file
+
+    @staticmethod
+    def header():
+        return json.dumps({"journal": uuid.uuid4().hex}) + "\n"
+
+    # Id in the header of the journal file `data`, None without one
+    @staticmethod
+    def parseId(data):
+        line = data[:data.find(b"\n") + 1]
+        if not line.startswith(b'{"journal"'):
+            return None
+        try:
+            return json.loads(line)["journal"]
+        except (json.JSONDecodeError, KeyError):
+            return None
+
+    # (records, end offset) of the complete lines of `data` after `offset`
+    @staticmethod
+    def parse(data, offset=0):
+        end = data.rfind(b"\n", offset) + 1 or offset
+        records = []
+        for line in data[offset:end].splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "journal" not in record:
+                records.append(record)
+        return records, end
+
+    # (id, bytes) of the journal file: read it under the lock, parse it after
+    def contents(self):
+        try:
+            with open(self.fileName, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None, b""
+        return self.parseId(data), data
+
+    def id(self):
+        try:
+            with open(self.fileName, "rb") as f:
+                return self.parseId(f.readline())
+        except FileNotFoundError:
+            return None
+
+    def _isCurrent(self):
+        try:
+            return os.stat(self.fileName).st_ino == os.fstat(self.file.fileno()).st_ino
+        except FileNotFoundError:
+            return False
+
+    # Returns the journal size before and after the record was added
+    def append(self, record):
+        f = self._open()
+        # Other processes append too: our position may be behind the end
+        start = f.seek(0, os.SEEK_END)
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        return start, f.tell()
+
+    def size(self):
+        try:
+            return os.path.getsize(self.fileName)
+        except FileNotFoundError:
+            return 0
+
+    # (records, end offset) of the complete lines after `offset`; a torn last
+    # line from a crash or an append in progress is left for later
+    def read(self, offset=0):
+        try:
+            with open(self.fileName, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+        records, end = self.parse(data)
+        return records, offset + end
+
+    # The records a deck file with high-water `mark` lacks, and the end offset
+    def replay(self, mark=None):
+        journalId, data = self.contents()
+        return self.parse(data, self.replayFrom(mark, journalId))
+
+    # Where the records missing from a deck file with `mark` start
+    @staticmethod
+    def replayFrom(mark, journalId):
+        if mark is not None and journalId is not None and mark[0] == journalId:
+            return mark[1]
+        return 0
+
+    # The records before `offset` are in the deck file now; later ones stay
+    def dropBefore(self, offset):
+        if self.size() <= offset:
+            self.discard()
+            return
+        if offset == 0:
+            return
+        with open(self.fileName, "rb") as f:
+            f.seek(offset)
+            tail = f.read()
+        tempName = self.fileName + ".tmp"
+        with open(tempName, "wb") as f:
+            # A new id: offsets into the old file mean nothing here
+            f.write(self.header().encode())
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tempName, self.fileName)
+
+    # The records are in the deck file now
+    def discard(self):
+        if os.path.exists(self.fileName):
+            os.remove(self.fileName)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,444 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import re
+import signal
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+
+from Brain import Management
+from Deck import Deck
+from DueQueue import DueQueue
+from DurableWriter import GroupCommit
+from FileManagment import FileManagement, runCommit
+from FrequencyIndex import getFrequencyIndex
+from PhrasalVerb import PhrasalVerb
+from Scheduler import Scheduler
+from Word import Word
+
+try:
+    import resource
+except ImportError:
+    # Windows: no descriptor limit to raise
+    resource = None
+
+# Local HTTP/JSON practice service for many learners in one process. Every
+# learner has their own decks (a FileManagement in data/users/<user>/), scored
+# and scheduled exactly like the terminal app; the word frequency index and
+# item difficulties are shared. Endpoints:
+#   GET  /users/<user>/next?kind=words|phrasal_verbs&mode=mixed|due
+#   POST /users/<user>/answer   {"kind": ..., "answer": "..."}
+#   GET  /users/<user>/report
+#   POST /users/<user>/items    {"kind": ..., "items": ["...", ...]}
+#   GET  /health
+
+USERS_DIR = "data/users"
+USER_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# kind -> item class and the field holding its text
+KINDS = {"words": (Word, "word"), "phrasal_verbs": (PhrasalVerb, "phrasal_verb")}
+MAX_BODY = 1024 * 1024
+# Header lines per request; each line is capped by the stream limit
+MAX_HEADERS = 100
+# Descriptors a loaded learner can hold: the lock file and two journals
+FILES_PER_SESSION = 3
+
+
+class HttpError(Exception):
+    def __init__(self, status, message) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# Read-only data every learner shares: the word frequency index (memory
+# mapped once per process) and item difficulties, which only depend on the text
+class SharedIndex:
+    def __init__(self) -> None:
+        self.frequencies = getFrequencyIndex()
+        self.difficulties = {}
+
+    def frequency(self, text):
+        return self.frequencies.frequency(text)
+
+    def difficulty(self, cls, text):
+        key = (cls, text)
+        difficulty = self.difficulties.get(key)
+        if difficulty is None:
+            difficulty = self.difficulties[key] = cls(text).difficulty
+        return difficulty
+
+
+# One learner's decks and schedulers, and the item waiting for an answer per
+# kind. Used on the event loop; anything touching the disk (loading, syncing,
+# recording an answer, saving) runs on a worker thread while the session's lock
+# is held.
+class LearnerSession:
+    def __init__(self, userId, storage, rng) -> None:
+        self.userId = userId
+        self.storage = storage
+        self.rng = rng
+        self.decks = {"words": storage.readWords(), "phrasal_verbs": storage.readPhrasalVerbs()}
+        self.schedulers = {kind: Scheduler(deck, rng) for kind, deck in self.decks.items()}
+        self.due = {kind: DueQueue(deck) for kind, deck in self.decks.items()}
+        # kind -> [item, wrong attempts so far]
+        self.pending = {}
+        self.lock = asyncio.Lock()
+        # Set once the session was unloaded; a request still holding it loads the learner again
+        self.closed = False
+
+    # Same as Management.syncFromStorage
+    def syncFromStorage(self):
+        for item in self.storage.refresh():
+            kind = "words" if isinstance(item, Word) else "phrasal_verbs"
+            if item in self.schedulers[kind]:
+                self.schedulers[kind].update(item)
+            self.due[kind].update(item)
+
+    # Report aggregates of both decks, with other processes' answers included
+    def report(self):
+        self.syncFromStorage()
+        return {kind: self.storage.reportStats(deck, KINDS[kind][1]) for kind, deck in self.decks.items()}
+
+    def record(self, kind, item):
+        if kind == "words":
+            self.storage.recordWord(item)
+        else:
+            self.storage.recordPhrasalVerb(item)
+
+    def save(self):
+        self.storage.saveWords(self.decks["words"])
+        self.storage.savePhrasalVerbs(self.decks["phrasal_verbs"])
+
+    def close(self):
+        self.save()
+        self.storage.close()
+
+
+def itemState(item, key, index):
+    text = getattr(item, key)
+    return {
+        "item": text,
+        "asked": item.asked,
+        "rightCount": item.rightCount,
+        "wrongCount": item.wrongCount,
+        "streak": item.streak,
+        "percentage": item.getPercentage(),
+        "category": item.category,
+        "difficulty": item.difficulty,
+        "frequency": index.frequency(text),
+        "dueAt": item.dueAt,
+    }
+
+
+class PracticeServer:
+    def __init__(self, directory=USERS_DIR, maxSessions=1000, seed=None) -> None:
+        self.directory = directory
+        self.maxSessions = maxSessions
+        self.seed = seed
+        # Least recently used first
+        self.sessions = OrderedDict()
+        # userId -> task loading or unloading that learner
+        self.loading = {}
+        self.unloading = {}
+        # One commit thread for every learner's saves and journal fsyncs
+        self.writer = GroupCommit(FileManagement.COMMIT_DELAY, runCommit)
+        self.index = SharedIndex()
+
+    def load(self, userId):
+        rng = random.Random(f"{self.seed}-{userId}") if self.seed is not None else random.Random()
+        storage = FileManagement(f"{self.directory}/{userId}", writer=self.writer)
+        return LearnerSession(userId, storage, rng)
+
+    async def session(self, userId):
+        if not USER_ID.match(userId):
+            raise HttpError(400, "user ids are 1-64 letters, digits, '-' or '_'")
+        session = self.sessions.get(userId)
+        if session is not None:
+            self.sessions.move_to_end(userId)
+            return session
+        task = self.loading.get(userId)
+        if task is None:
+            task = self.loading[userId] = asyncio.ensure_future(self.loadSession(userId))
+        return await task
+
+    async def loadSession(self, userId):
+        try:
+            unloading = self.unloading.get(userId)
+            if unloading is not None:
+                await unloading
+            session = await asyncio.to_thread(self.load, userId)
+            self.sessions[userId] = session
+            self.evict()
+            return session
+        finally:
+            del self.loading[userId]
+
+    # Unload the least recently used idle learners beyond maxSessions
+    def evict(self):
+        for userId in list(self.sessions):
+            if len(self.sessions) <= self.maxSessions:
+                break
+            session = self.sessions[userId]
+            if session.lock.locked():
+                continue
+            del self.sessions[userId]
+            task = self.unloading[userId] = asyncio.ensure_future(self.unloadSession(session))
+            task.add_done_callback(lambda task, userId=userId: self.unloading.get(userId) is task and self.unloading.pop(userId))
+
+    async def unloadSession(self, session):
+        async with session.lock:
+            session.closed = True
+            await asyncio.to_thread(session.close)
+
+    # The learner's session, locked for the duration of one request
+    @contextlib.asynccontextmanager
+    async def locked(self, userId):
+        while True:
+            session = await self.session(userId)
+            async with session.lock:
+                if not session.closed:
+                    yield session
+                    return
+
+    async def close(self):
+        sessions = list(self.sessions.values())
+        self.sessions.clear()
+        await asyncio.gather(*(self.unloadSession(session) for session in sessions), *self.unloading.values())
+        await asyncio.to_thread(self.writer.close)
+
+    # The item to spell next. It stays the same until it is spelled right,
+    # like a turn in the terminal app.
+    async def next(self, userId, kind, mode):
+        async with self.locked(userId) as session:
+            pending = session.pending.get(kind)
+            if pending is not None:
+                item = pending[0]
+            else:
+                await asyncio.to_thread(session.syncFromStorage)
+                if mode == "due":
+                    item = session.due[kind].nextDue(time.time())
+                else:
+                    item = session.schedulers[kind].next()
+                if item is None:
+                    return {"kind": kind, "item": None}
+                session.pending[kind] = [item, 0]
+            return dict(itemState(item, KINDS[kind][1], self.index), kind=kind)
+
+    # Scored like Management.processWord: a wrong attempt counts against the
+    # item and shows the answer, a right one ends the turn, grades the review
+    # and persists the item
+    async def answer(self, userId, kind, answer):
+        async with self.locked(userId) as session:
+            pending = session.pending.get(kind)
+            if pending is None:
+                raise HttpError(409, f"no {kind} item is waiting for an answer, ask for the next one first")
+            item, wrongAttempts = pending
+            key = KINDS[kind][1]
+            correct = Deck.normalize(answer) == getattr(item, key)
+            item.recordAnswer(correct)
+            if correct:
+                del session.pending[kind]
+                item.update_category()
+                item.review(Management.reviewQuality(wrongAttempts), time.time())
+                session.due[kind].update(item)
+                if item in session.schedulers[kind]:
+                    session.schedulers[kind].update(item)
+                await asyncio.to_thread(session.record, kind, item)
+            else:
+                pending[1] += 1
+            response = {"kind": kind, "correct": correct, "state": itemState(item, key, self.index)}
+            if not correct:
+                response["expected"] = getattr(item, key)
+            return response
+
+    async def report(self, userId):
+        async with self.locked(userId) as session:
+            return await asyncio.to_thread(session.report)
+
+    async def addItems(self, userId, kind, texts):
+        async with self.locked(userId) as session:
+            deck = session.decks[kind]
+            texts = [text for text in texts if isinstance(text, str) and text.strip() and text not in deck]
+            # Scoring new items (syllables, word frequency) is CPU work like the save
+            added = await asyncio.to_thread(self.addToDeck, session, kind, texts) if texts else 0
+            return {"kind": kind, "added": added, "total": len(deck)}
+
+    # Runs on a worker thread while the session's lock is held
+    def addToDeck(self, session, kind, texts):
+        cls = KINDS[kind][0]
+        deck = session.decks[kind]
+        added = 0
+        for text in texts:
+            text = Deck.normalize(text)
+            if text not in deck:
+                added += deck.append(cls(text, difficulty=self.index.difficulty(cls, text)))
+        if added:
+            session.schedulers[kind] = Scheduler(deck, session.rng)
+            session.save()
+        return added
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["health"]:
+            return {"sessions": len(self.sessions)}
+        if len(parts) != 3 or parts[0] != "users":
+            raise HttpError(404, f"no such endpoint: {url.path}")
+        userId, action = parts[1], parts[2]
+        routes = {"next": "GET", "report": "GET", "answer": "POST", "items": "POST"}
+        if action not in routes:
+            raise HttpError(404, f"no such endpoint: {url.path}")
+        if method != routes[action]:
+            raise HttpError(405, f"{url.path} expects {routes[action]}")
+        if method == "POST":
+            try:
+                query.update(json.loads(body or b"{}"))
+            except (json.JSONDecodeError, TypeError, ValueError):
+                raise HttpError(400, "the request body must be a JSON object")
+        kind = query.get("kind", "words")
+        if kind not in KINDS:
+            raise HttpError(400, f"kind must be one of {', '.join(KINDS)}")
+        if action == "next":
+            return await self.next(userId, kind, query.get("mode", "mixed"))
+        if action == "answer":
+            if not isinstance(query.get("answer"), str):
+                raise HttpError(400, "answer must be a string")
+            return await self.answer(userId, kind, query["answer"])
+        if action == "items":
+            if not isinstance(query.get("items"), list):
+                raise HttpError(400, "items must be a list of strings")
+            return await self.addItems(userId, kind, query["items"])
+        return await self.report(userId)
+
+    # One client connection, with HTTP/1.1 keep-alive
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await readRequest(reader)
+                except HttpError as e:
+                    writeResponse(writer, e.status, {"error": e.message}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, keepAlive, body = request
+                try:
+                    status, payload = 200, await self.dispatch(method, target, body)
+                except HttpError as e:
+                    status, payload = e.status, {"error": e.message}
+                except Exception as e:
+                    print(f"Error handling {method} {target}: {e!r}")
+                    status, payload = 500, {"error": "internal error"}
+                writeResponse(writer, status, payload, keepAlive)
+                await writer.drain()
+                if not keepAlive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+# A line of the request head; one longer than the stream limit is a bad request
+async def readLine(reader):
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HttpError(400, "request line or header too long")
+
+
+# (method, target, keep-alive, body), or None once the client is done
+async def readRequest(reader):
+    line = await readLine(reader)
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+    headers = {}
+    for _ in range(MAX_HEADERS + 1):
+        line = await readLine(reader)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HttpError(400, f"requests are limited to {MAX_HEADERS} header lines")
+    connection = headers.get("connection", "").lower()
+    keepAlive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+    length = headers.get("content-length", "0")
+    # Plain digits only: int() would also take signs, spaces and underscores
+    if not length.isascii() or not length.isdigit():
+        raise HttpError(400, "malformed Content-Length")
+    length = int(length)
+    if length > MAX_BODY:
+        raise HttpError(413, f"request bodies are limited to {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method, target, keepAlive, body
+
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def writeResponse(writer, status, payload, keepAlive):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keepAlive else 'close'}\r\n\r\n".encode() + body
+    )
+
+
+# Raise the open file limit as far as allowed; returns the new soft limit
+def raiseFileLimit():
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        soft = hard
+    return soft
+
+
+async def serve(host, port, directory, maxSessions, seed=None):
+    limit = raiseFileLimit()
+    if limit is not None and limit != resource.RLIM_INFINITY:
+        # Leave room for client connections
+        maxSessions = max(1, min(maxSessions, limit // (2 * FILES_PER_SESSION)))
+    practice = PracticeServer(directory, maxSessions, seed)
+    server = await asyncio.start_server(practice.handle, host, port, backlog=4096)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signalNumber in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signalNumber, stop.set)
+        except NotImplementedError:
+            pass
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f"Serving on http://{host}:{port} (up to {maxSessions} learners loaded)", flush=True)
+    async with server:
+        await stop.wait()
+    await practice.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve spelling practice for many learners over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="0 picks a free port")
+    parser.add_argument("--directory", default=USERS_DIR, help="one sub-directory of decks per learner")
+    parser.add_argument("--max-sessions", type=int, default=2000, help="learners kept loaded, least recently used are saved and unloaded")
+    parser.add_argument("--seed", type=int, help="reproducible item selection")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.directory, args.max_sessions, args.seed))
+
+
+if __name__ == "__main__":
+    main()
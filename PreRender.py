@@ -0,0 +1,80 @@
+import argparse
+import multiprocessing
+import os
+import time
+from AudioCache import AudioCache
+from Storage import createStorage
+from TextToSpeech import PYTTS
+
+# Per-process engine and cache, set up once by the pool initializer
+_engine = None
+_cache = None
+
+
+def initWorker(directory):
+    global _engine, _cache
+    _engine = PYTTS()
+    _cache = AudioCache(directory)
+
+
+# Returns (text, path, cached, error). The cache lookup happens here because
+# only the workers initialize a speech engine to compute the voice part of the key
+def renderClip(text):
+    try:
+        path = _cache.pathFor(_engine, text)
+        if os.path.exists(path):
+            return text, path, True, None
+        return text, _cache.writeClip(_engine, text), False, None
+    except Exception as e:
+        return text, None, False, str(e)
+
+
+# Every word and phrasal verb of the saved decks, without duplicates
+def deckTexts(storage):
+    texts = [word.word for word in storage.readWords()]
+    texts += [pv.phrasal_verb for pv in storage.readPhrasalVerbs()]
+    return list(dict.fromkeys(texts))
+
+
+# Renders every clip that isn't cached yet. Finished clips stay in the cache,
+# so an interrupted run picks up where it stopped.
+def preRender(texts, cache, processes=None):
+    cache.removeTempFiles()
+    rendered = 0
+    cached = 0
+    failed = 0
+    start = time.perf_counter()
+    processes = processes or os.cpu_count()
+    with multiprocessing.Pool(processes, initializer=initWorker, initargs=(cache.directory,)) as pool:
+        try:
+            for text, path, wasCached, error in pool.imap_unordered(renderClip, texts, chunksize=8):
+                if path is None:
+                    failed += 1
+                    print(f"Failed to render '{text}': {error}")
+                    continue
+                if wasCached:
+                    cached += 1
+                    continue
+                cache.add(path)
+                rendered += 1
+                if rendered % 100 == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"{rendered} clips rendered ({cached} already cached), {rendered / elapsed:.1f} clips/s")
+        except KeyboardInterrupt:
+            pool.terminate()
+            print(f"\nInterrupted after {rendered} clips, run again to resume.")
+    elapsed = time.perf_counter() - start
+    rate = rendered / elapsed if elapsed else 0.0
+    print(f"Rendered {rendered} clips ({cached} already cached, {failed} failed) in {elapsed:.1f}s "
+          f"using {processes} processes: {rate:.1f} clips/s")
+    return rendered, rate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render audio for the whole deck before practicing")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--max-mb", type=int, default=None, help="audio cache size cap, make it fit the whole deck")
+    args = parser.parse_args()
+
+    maxBytes = args.max_mb * 1024 * 1024 if args.max_mb else None
+    preRender(deckTexts(createStorage()), AudioCache(maxBytes=maxBytes), args.processes)
@@ -0,0 +1,106 @@
+import argparse
+import heapq
+import json
+import weakref
+from operator import itemgetter
+from Word import Word
+
+CATEGORIES = (Word.CATEGORY_MASTERED, Word.CATEGORY_AVERAGE, Word.CATEGORY_STRUGGLING)
+# Percentiles of the per-item percentage right, over the items asked at least once
+PERCENTILES = (10, 25, 50, 75, 90)
+# Items listed as struggling and as mastered
+LIMIT = 10
+
+# Deck -> (generation, limit, report); an entry is used while the deck's
+# generation is unchanged and dropped with the deck
+cache = weakref.WeakKeyDictionary()
+
+
+# Nearest-rank percentiles from a {value: count} histogram of `total` values
+def percentiles(histogram, total):
+    result = {f"p{p}": None for p in PERCENTILES}
+    if not total:
+        return result
+    ranks = [(f"p{p}", max(1, -(-p * total // 100))) for p in PERCENTILES]
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        while ranks and ranks[0][1] <= seen:
+            result[ranks.pop(0)[0]] = value
+    return result
+
+
+# Aggregates behind miniReport in a single pass over `items` (a Deck or a list
+# of Words or PhrasalVerbs): category counts, answer totals, percentiles, and
+# the `limit` lowest scoring struggling and highest scoring mastered items as
+# (text, percentage, streak). Only items asked more than once are listed. Plain
+# dicts and lists, ready for json.dumps.
+def buildReport(items, key, limit=LIMIT):
+    counts = dict.fromkeys(CATEGORIES, 0)
+    histogram = {}
+    answers = right = practiced = 0
+    struggling = []
+    mastered = []
+    for item in items:
+        category = item.category
+        counts[category] = counts.get(category, 0) + 1
+        asked = item.asked
+        if not asked:
+            continue
+        answers += asked
+        right += item.rightCount
+        practiced += 1
+        percentage = item.rightCount / asked * 100
+        histogram[percentage] = histogram.get(percentage, 0) + 1
+        if asked > 1:
+            if category == Word.CATEGORY_STRUGGLING:
+                struggling.append((getattr(item, key), percentage, item.streak))
+            elif category == Word.CATEGORY_MASTERED:
+                mastered.append((getattr(item, key), percentage, item.streak))
+    return {
+        "total": len(items),
+        "practiced": practiced,
+        "answers": answers,
+        "accuracy": right / answers * 100 if answers else 0,
+        "counts": counts,
+        "percentiles": percentiles(histogram, practiced),
+        "struggling": heapq.nsmallest(limit, struggling, key=itemgetter(1)),
+        "strugglingTotal": len(struggling),
+        "mastered": heapq.nlargest(limit, mastered, key=itemgetter(1, 2)),
+        "masteredTotal": len(mastered),
+    }
+
+
+# buildReport, cached per Deck until the deck changes. The report is shared
+# between callers, so copy it before modifying it.
+def deckReport(deck, key, limit=LIMIT):
+    generation = getattr(deck, "generation", None)
+    if generation is None:
+        return buildReport(deck, key, limit)
+    entry = cache.get(deck)
+    if entry is None or entry[0] != generation or entry[1] != limit:
+        entry = (generation, limit, buildReport(deck, key, limit))
+        cache[deck] = entry
+    return entry[2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the practice report of the stored decks as JSON")
+    parser.add_argument("--backend", choices=["json", "sqlite"], help="storage backend, STORAGE_BACKEND by default")
+    parser.add_argument("--limit", type=int, default=LIMIT, help="struggling and mastered items listed")
+    args = parser.parse_args()
+
+    from Storage import createStorage
+    storage = createStorage(args.backend)
+    try:
+        report = {
+            "words": storage.reportStats(storage.readWords(), "word", args.limit),
+            "phrasal_verbs": storage.reportStats(storage.readPhrasalVerbs(), "phrasal_verb", args.limit),
+        }
+    finally:
+        storage.close()
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import random
+from Word import Word
+
+CATEGORY_WEIGHTS = {
+    Word.CATEGORY_STRUGGLING: 3.0,
+    Word.CATEGORY_AVERAGE: 1.5,
+    Word.CATEGORY_MASTERED: 0.5,
+}
+
+
+# How much an item deserves practice: weak performance, hard and struggling
+# items get drawn more often. Works for Word and PhrasalVerb.
+def samplingWeight(item):
+    weakness = 1 + (100 - item.getWeightedPerformance()) / 25
+    return CATEGORY_WEIGHTS.get(item.category, 1.0) * weakness * item.difficulty
+
+
+# Draws items with probability proportional to their weight. Weights live in a
+# Fenwick tree so both re-weighting an item and drawing are O(log n).
+class WeightedSampler:
+    # Rebuild the tree from the exact weights every so often to stop float drift
+    REBUILD_AFTER = 100000
+
+    def __init__(self, items, weight=samplingWeight, rng=None) -> None:
+        self.rng = rng if rng is not None else random
+        self.weight = weight
+        self.items = list(items)
+        self.positions = {item: i for i, item in enumerate(self.items)}
+        self.weights = [max(weight(item), 0.0) for item in self.items]
+        self.rebuild()
+
+    def rebuild(self):
+        size = len(self.weights)
+        tree = [0.0] + self.weights
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self.tree = tree
+        self.total = sum(self.weights)
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def set(self, position, value):
+        delta = value - self.weights[position]
+        self.weights[position] = value
+        self.total += delta
+        i = position + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+        self.updates += 1
+        if self.updates >= self.REBUILD_AFTER:
+            self.rebuild()
+
+    # Call after an item's counters or category changed
+    def update(self, item):
+        if item in self.positions:
+            self.set(self.positions[item], max(self.weight(item), 0.0))
+
+    # Removed items keep their slot with weight 0 so positions stay valid
+    def remove(self, item):
+        position = self.positions.pop(item)
+        self.set(position, 0.0)
+
+    # None when nothing has a positive weight
+    def draw(self):
+        if not self.positions or self.total <= 1e-9:
+            return None
+        target = self.rng.random() * self.total
+        position = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            candidate = position + step
+            if candidate < len(self.tree) and self.tree[candidate] <= target:
+                position = candidate
+                target -= self.tree[candidate]
+            step >>= 1
+        # Float rounding can land on a zero-weight (e.g. removed) slot
+        position = min(position, len(self.weights) - 1)
+        while position < len(self.weights) - 1 and self.weights[position] == 0:
+            position += 1
+        while position > 0 and self.weights[position] == 0:
+            position -= 1
+        return self.items[position]
@@ -0,0 +1,95 @@
+import heapq
+import random
+from Sampler import WeightedSampler
+from Instrumentation import timed
+
+
+# Priority queue over a deck ordered by Word.cmp / PhrasalVerb.cmp (through
+# priorityKey). Only the item that was just answered gets re-keyed, stale heap
+# entries are skipped lazily when they reach the top. Explore picks come from
+# a WeightedSampler, so weaker items are explored more often.
+class Scheduler:
+    EXPLOIT_PROBABILITY = 0.7
+    # Decks this large are ranked with NumPy (Scoring.DeckScores); smaller ones
+    # don't make up for importing it
+    VECTORIZED_FROM = 20000
+
+    @timed("scheduler.build")
+    def __init__(self, items, rng=None) -> None:
+        self.rng = rng if rng is not None else random
+        self.items = list(items)
+        self.positions = {item: i for i, item in enumerate(self.items)}
+        self.entries = {}
+        self.heap = []
+        if len(self.items) >= self.VECTORIZED_FROM:
+            # Keys and order for the whole deck at once; a sorted list is a heap already
+            from Scoring import DeckScores
+            keys, order = DeckScores(self.items).ranking()
+            for index in order.tolist():
+                item = self.items[index]
+                entry = [keys[index], index, item, True]
+                self.entries[item] = entry
+                self.heap.append(entry)
+        else:
+            for index, item in enumerate(self.items):
+                entry = [item.priorityKey(), index, item, True]
+                self.entries[item] = entry
+                self.heap.append(entry)
+            heapq.heapify(self.heap)
+        self.sampler = WeightedSampler(self.items, rng=self.rng)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.entries
+
+    # Best item according to the cmp ordering (ties keep deck order like sorted() did)
+    def peek(self):
+        while self.heap and not self.heap[0][3]:
+            heapq.heappop(self.heap)
+        return self.heap[0][2] if self.heap else None
+
+    # The n highest priority items, for prefetching their audio
+    def upcoming(self, n):
+        taken = []
+        while self.heap and len(taken) < n:
+            entry = heapq.heappop(self.heap)
+            if entry[3]:
+                taken.append(entry)
+        for entry in taken:
+            heapq.heappush(self.heap, entry)
+        return [entry[2] for entry in taken]
+
+    # 70% of the time the highest priority item, otherwise a weighted random one
+    @timed("scheduler.next")
+    def next(self):
+        if not self.items:
+            return None
+        if self.rng.random() < self.EXPLOIT_PROBABILITY:
+            return self.peek()
+        return self.sampler.draw() or self.rng.choice(self.items)
+
+    # Call after an item's counters changed
+    @timed("scheduler.update")
+    def update(self, item):
+        old = self.entries[item]
+        old[3] = False
+        entry = [item.priorityKey(), old[1], item, True]
+        self.entries[item] = entry
+        heapq.heappush(self.heap, entry)
+        self.sampler.update(item)
+        # Don't let invalidated entries pile up over long sessions
+        if len(self.heap) > 2 * len(self.entries) + 16:
+            self.heap = [e for e in self.heap if e[3]]
+            heapq.heapify(self.heap)
+
+    # Take an item out of the session, e.g. when it left the category being practiced
+    def remove(self, item):
+        self.entries.pop(item)[3] = False
+        self.sampler.remove(item)
+        position = self.positions.pop(item)
+        last = self.items.pop()
+        if last is not item:
+            self.items[position] = last
+            self.positions[last] = position
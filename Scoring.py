@@ -0,0 +1,66 @@
+import numpy as np
+from Word import Word
+
+# Category codes, the same as priorityKey's rank
+STRUGGLING, AVERAGE, MASTERED = 0, 1, 2
+CATEGORIES = [Word.CATEGORY_STRUGGLING, Word.CATEGORY_AVERAGE, Word.CATEGORY_MASTERED]
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+
+
+# Columnar copy of a deck's stats with vectorized versions of getPercentage,
+# getWeightedPerformance and update_category. Works for Word and PhrasalVerb
+# decks and gives the same floats as the per-object methods (same operations
+# in the same order).
+class DeckScores:
+    def __init__(self, items) -> None:
+        self.items = items
+        count = len(items)
+        self.asked = np.fromiter((item.asked for item in items), dtype=np.int64, count=count)
+        self.rightCount = np.fromiter((item.rightCount for item in items), dtype=np.int64, count=count)
+        self.wrongCount = np.fromiter((item.wrongCount for item in items), dtype=np.int64, count=count)
+        self.streak = np.fromiter((item.streak for item in items), dtype=np.int64, count=count)
+        self.difficulty = np.fromiter((item.difficulty for item in items), dtype=np.float64, count=count)
+        self.category = np.fromiter((CATEGORY_CODES[item.category] for item in items), dtype=np.int8, count=count)
+
+    def percentage(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentage = (self.rightCount / self.asked) * 100
+        return np.where(self.asked == 0, 0.0, percentage)
+
+    def weightedPerformance(self):
+        streak_bonus = self.streak * 0.05
+        difficulty_factor = 1 + (self.difficulty - 1) * 0.1
+        category_factor = np.where(self.category == STRUGGLING, 0.7, np.where(self.category == MASTERED, 1.2, 1.0))
+        weighted_performance = self.percentage() * streak_bonus * difficulty_factor * category_factor
+        return np.where(self.asked == 0, 0.0, np.minimum(weighted_performance, 100))
+
+    # Category codes update_category would assign
+    def categories(self):
+        percentage = self.percentage()
+        categories = np.where(
+            (percentage >= 95) & (self.streak > 4),
+            MASTERED,
+            np.where((percentage <= 80) | (self.wrongCount > self.rightCount), STRUGGLING, AVERAGE),
+        )
+        return np.where(self.asked < 3, AVERAGE, categories).astype(np.int8)
+
+    # (priorityKey of every item, deck indices in Word.cmp order with ties in
+    # deck order)
+    def ranking(self):
+        weighted = self.weightedPerformance()
+        order = np.lexsort((np.arange(len(self.items)), self.streak, weighted, self.category))
+        keys = list(zip(self.category.tolist(), weighted.tolist(), self.streak.tolist()))
+        return keys, order
+
+
+# Vectorized update_category over a whole deck; only items whose category
+# changes are touched. Returns how many changed.
+def recategorize(items):
+    if not items:
+        return 0
+    scores = DeckScores(items)
+    categories = scores.categories()
+    changed = np.nonzero(categories != scores.category)[0]
+    for index in changed.tolist():
+        items[index].category = CATEGORIES[categories[index]]
+    return len(changed)
@@ -0,0 +1,83 @@
+import gc
+import hashlib
+import os
+import pickle
+import threading
+
+# Binary copy of a deck saved next to its JSON file (data/words.json ->
+# data/words.snapshot). Unpickling restores the Word/PhrasalVerb slots, the
+# category buckets and the spelling index directly, without running any
+# constructor. The header records the JSON file it was made from: the snapshot
+# is only used while that file has the same size and SHA-256, so editing or
+# replacing the JSON invalidates it.
+# Snapshots are only ever read from our own data directory.
+VERSION = 3
+
+
+def snapshotFileName(fileName):
+    return os.path.splitext(fileName)[0] + ".snapshot"
+
+
+def layout(cls):
+    return (cls.__name__, cls.__slots__)
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def dumps(deck):
+    return pickle.dumps(deck, protocol=5)
+
+
+# `pickled` is dumps(deck), `data` the JSON exactly as written to `fileName`
+# and `mark` its journal high-water mark (see FileManagement.parseDeckFile).
+# Call it while nothing else can replace `fileName`.
+def write(fileName, pickled, cls, data, mark):
+    header = (VERSION, layout(cls), len(data), digest(data), mark)
+    tempName = f"{snapshotFileName(fileName)}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tempName, "wb") as f:
+            pickle.dump(header, f, protocol=5)
+            f.write(pickled)
+        os.replace(tempName, snapshotFileName(fileName))
+    except OSError as e:
+        if os.path.exists(tempName):
+            os.remove(tempName)
+        print(f"Could not write the snapshot of {fileName}: {e}")
+
+
+def isCurrent(header, fileName, cls):
+    if len(header) != 5:
+        return False
+    version, savedLayout, size, sha256, _ = header
+    if version != VERSION or savedLayout != layout(cls):
+        return False
+    if os.path.getsize(fileName) != size:
+        return False
+    with open(fileName, "rb") as f:
+        return digest(f.read()) == sha256
+
+
+# (deck, journal high-water mark) stored for `fileName`, or (None, None) when
+# there is no current snapshot
+def read(fileName, cls):
+    try:
+        with open(snapshotFileName(fileName), "rb") as f:
+            header = pickle.load(f)
+            if not isCurrent(header, fileName, cls):
+                return None, None
+            # Nothing to collect while the deck is being built, and the
+            # collector would otherwise walk it again and again
+            collecting = gc.isenabled()
+            gc.disable()
+            try:
+                return pickle.load(f), header[4]
+            finally:
+                if collecting:
+                    gc.enable()
+    except FileNotFoundError:
+        return None, None
+    except Exception as e:
+        print(f"Ignoring unreadable snapshot of {fileName}: {e}")
+        return None, None
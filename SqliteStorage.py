@@ -0,0 +1,264 @@
+from datetime import datetime
+import json
+import os
+import sqlite3
+import sys
+from Word import Word
+from PhrasalVerb import PhrasalVerb
+from Storage import StorageBackend
+from Deck import Deck
+from Instrumentation import timed
+from Report import CATEGORIES, LIMIT, percentiles
+
+COLUMNS = ["rightCount", "wrongCount", "asked", "streak", "difficulty", "category", "ease", "interval", "repetitions", "dueAt"]
+
+# Columns added after the first schema, with their definitions
+ADDED_COLUMNS = {
+    "ease": "REAL",
+    "interval": "REAL NOT NULL DEFAULT 0",
+    "repetitions": "INTEGER NOT NULL DEFAULT 0",
+    "dueAt": "REAL",
+    # Change number of the last write to the row, see SqliteStorage.refresh
+    "seq": "INTEGER NOT NULL DEFAULT 0",
+}
+
+# Counters written as increments, in the order of unsyncedCounts()
+COUNTERS = ["rightCount", "wrongCount", "asked"]
+
+# table name -> column holding the item's text
+TABLES = {"words": "word", "phrasal_verbs": "phrasal_verb"}
+
+
+class SqliteStorage(StorageBackend):
+    def __init__(self, fileName="data/practice.sqlite3") -> None:
+        self.fileName = fileName
+        directory = os.path.dirname(fileName)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        # Several processes may share the database: wait for their locks
+        # instead of failing, and let readers run next to a writer (WAL)
+        self.connection = sqlite3.connect(fileName, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.words = Deck(key="word")
+        self.phrasal_verbs = Deck(key="phrasal_verb")
+        # table -> highest change number our decks reflect
+        self.seen = {table: 0 for table in TABLES}
+        self.createSchema()
+        self.dataVersion = self.currentDataVersion()
+
+    def createSchema(self):
+        with self.connection:
+            for table, key in TABLES.items():
+                self.connection.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        id INTEGER PRIMARY KEY,
+                        {key} TEXT NOT NULL UNIQUE,
+                        rightCount INTEGER NOT NULL DEFAULT 0,
+                        wrongCount INTEGER NOT NULL DEFAULT 0,
+                        asked INTEGER NOT NULL DEFAULT 0,
+                        streak INTEGER NOT NULL DEFAULT 0,
+                        difficulty REAL,
+                        category TEXT NOT NULL
+                    )""")
+                existing = {row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+                for column, definition in ADDED_COLUMNS.items():
+                    if column not in existing:
+                        self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                self.connection.execute("CREATE TABLE IF NOT EXISTS sequences (name TEXT PRIMARY KEY, seq INTEGER NOT NULL)")
+                self.connection.execute("INSERT OR IGNORE INTO sequences (name, seq) VALUES (?, 0)", (table,))
+                for column in ("category", "difficulty", "streak", "dueAt", "seq"):
+                    self.connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+
+    @timed("storage.readItems")
+    def readItems(self, table, cls):
+        key = TABLES[table]
+        self.seen[table] = self.connection.execute("SELECT seq FROM sequences WHERE name = ?", (table,)).fetchone()[0]
+        rows = self.connection.execute(f"SELECT {key}, {', '.join(COLUMNS)} FROM {table} ORDER BY id")
+        deck = Deck((cls(*row) for row in rows), key)
+        deck.markClean()
+        return deck
+
+    # Bumped by SQLite whenever another connection commits
+    def currentDataVersion(self):
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    # Number for the next write to `table`; call inside the write transaction
+    def nextSeq(self, table):
+        self.connection.execute("UPDATE sequences SET seq = seq + 1 WHERE name = ?", (table,))
+        return self.connection.execute("SELECT seq FROM sequences WHERE name = ?", (table,)).fetchone()[0]
+
+    def readWords(self):
+        self.words = self.readItems("words", Word)
+        return self.words
+
+    def readPhrasalVerbs(self):
+        self.phrasal_verbs = self.readItems("phrasal_verbs", PhrasalVerb)
+        return self.phrasal_verbs
+
+    # Counters are added as deltas (what changed since the item was last
+    # synced), so answers other processes wrote to the same row add up; the
+    # other columns are overwritten
+    @timed("storage.upsert")
+    def upsert(self, table, items):
+        key = TABLES[table]
+        seq = self.nextSeq(table)
+        updates = ", ".join([f"{column} = {column} + ?" for column in COUNTERS] +
+                            [f"{column} = excluded.{column}" for column in COLUMNS if column not in COUNTERS] +
+                            ["seq = excluded.seq"])
+        rows = []
+        for item in items:
+            rows.append([getattr(item, key)] + [getattr(item, column) for column in COLUMNS] + [seq] + item.unsyncedCounts())
+            item.markSynced()
+            item.markClean()
+        self.connection.executemany(
+            f"INSERT INTO {table} ({key}, {', '.join(COLUMNS)}, seq) VALUES ({', '.join('?' * (len(COLUMNS) + 2))}) "
+            f"ON CONFLICT({key}) DO UPDATE SET {updates}",
+            rows,
+        )
+
+    # Only the loaded deck's dirty items are written; any other list of items
+    # is written whole
+    def saveChanges(self, table, items, loaded):
+        if items is loaded:
+            if not items.dirty:
+                return
+            items = list(items.dirty)
+        with self.connection:
+            self.upsert(table, items)
+
+    def saveWords(self, words):
+        self.saveChanges("words", words, self.words)
+
+    def savePhrasalVerbs(self, phrasal_verbs):
+        self.saveChanges("phrasal_verbs", phrasal_verbs, self.phrasal_verbs)
+
+    def recordWord(self, word):
+        self.saveWords([word])
+
+    def recordPhrasalVerb(self, phrasal_verb):
+        self.savePhrasalVerbs([phrasal_verb])
+
+    def resetScore(self, table, type, items):
+        # Store unsaved items first, the reset below only updates rows
+        self.saveChanges(table, items, items)
+        # Archive the current scores as JSON, like the file backend does
+        archive_name = os.path.join(os.path.dirname(self.fileName),
+                                    f"Archive-{type}-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+        with open(archive_name, "w") as f:
+            f.write(json.dumps([item.toDict() for item in items]))
+        for item in items:
+            item.asked = item.rightCount = item.wrongCount = item.streak = 0
+            item.category = Word.CATEGORY_AVERAGE
+            item.ease, item.interval, item.repetitions, item.dueAt = item.DEFAULT_EASE, 0, 0, None
+            item.markSynced()
+            item.markDirty()
+        with self.connection:
+            self.connection.execute(
+                f"UPDATE {table} SET asked = 0, rightCount = 0, wrongCount = 0, streak = 0, category = ?, "
+                "ease = ?, interval = 0, repetitions = 0, dueAt = NULL, seq = ?",
+                (Word.CATEGORY_AVERAGE, Word.DEFAULT_EASE, self.nextSeq(table)),
+            )
+        items.markClean()
+
+    # Rows other connections wrote since we last looked are merged into the
+    # decks: what the row holds beyond an item's synced counters came from
+    # elsewhere and is added to ours. Costs one PRAGMA when nothing changed.
+    @timed("storage.refresh")
+    def refresh(self):
+        dataVersion = self.currentDataVersion()
+        if dataVersion == self.dataVersion:
+            return []
+        self.dataVersion = dataVersion
+        changed = []
+        for table, deck, cls in (("words", self.words, Word), ("phrasal_verbs", self.phrasal_verbs, PhrasalVerb)):
+            key = TABLES[table]
+            rows = self.connection.execute(
+                f"SELECT {key}, {', '.join(COLUMNS)}, seq FROM {table} WHERE seq > ? ORDER BY seq", (self.seen[table],)
+            ).fetchall()
+            for row in rows:
+                self.seen[table] = max(self.seen[table], row[-1])
+                item = deck.find(row[0])
+                if item is None:
+                    item = cls(*row[:-1])
+                    deck.append(item)
+                    item.markClean()
+                    changed.append(item)
+                    continue
+                state = dict(zip(COLUMNS, row[1:-1]))
+                diff = [state[column] - old for column, old in zip(COUNTERS, (item.syncedRight, item.syncedWrong, item.syncedAsked))]
+                if any(diff):
+                    dirty = item.dirty
+                    item.addStoredCounts(*diff)
+                    for column in COLUMNS:
+                        if column not in COUNTERS:
+                            setattr(item, column, state[column])
+                    if not dirty:
+                        item.markClean()
+                    changed.append(item)
+        return changed
+
+    def resetWordScore(self):
+        self.resetScore("words", "Words", self.words)
+
+    def resetPhrasalVerbScore(self):
+        self.resetScore("phrasal_verbs", "PhrasalVerbs", self.phrasal_verbs)
+
+    # Same aggregates as StorageBackend.reportStats, computed by SQLite from the
+    # rows kept current by recordWord/recordPhrasalVerb; the loaded deck's
+    # unsaved changes are written first. Other lists of items are reported in memory.
+    @timed("storage.reportStats")
+    def reportStats(self, items, key, limit=LIMIT):
+        table = next(t for t, k in TABLES.items() if k == key)
+        loaded = self.words if table == "words" else self.phrasal_verbs
+        if items is not loaded:
+            return super().reportStats(items, key, limit)
+        self.saveChanges(table, items, loaded)
+        # The same float operations as buildReport
+        percentage = "CAST(rightCount AS REAL) / asked * 100"
+        query = self.connection.execute
+        total, practiced, answers, right = query(
+            f"SELECT COUNT(*), COUNT(NULLIF(asked, 0)), TOTAL(asked), TOTAL(rightCount) FROM {table}"
+        ).fetchone()
+        answers, right = int(answers), int(right)
+        counts = dict.fromkeys(CATEGORIES, 0)
+        counts.update(query(f"SELECT category, COUNT(*) FROM {table} GROUP BY category"))
+        histogram = dict(query(f"SELECT {percentage} AS p, COUNT(*) FROM {table} WHERE asked > 0 GROUP BY p"))
+        listed = f"SELECT {key}, {percentage} AS p, streak FROM {table} WHERE category = ? AND asked > 1"
+        listedTotal = f"SELECT COUNT(*) FROM {table} WHERE category = ? AND asked > 1"
+        return {
+            "total": total,
+            "practiced": practiced,
+            "answers": answers,
+            "accuracy": right / answers * 100 if answers else 0,
+            "counts": counts,
+            "percentiles": percentiles(histogram, practiced),
+            "struggling": query(f"{listed} ORDER BY p, id LIMIT ?", (Word.CATEGORY_STRUGGLING, limit)).fetchall(),
+            "strugglingTotal": query(listedTotal, (Word.CATEGORY_STRUGGLING,)).fetchone()[0],
+            "mastered": query(f"{listed} ORDER BY p DESC, streak DESC, id LIMIT ?", (Word.CATEGORY_MASTERED, limit)).fetchall(),
+            "masteredTotal": query(listedTotal, (Word.CATEGORY_MASTERED,)).fetchone()[0],
+        }
+
+    def close(self):
+        self.connection.close()
+
+
+# Import the JSON decks (and any pending journal records) into the SQLite database
+def migrateFromJson(fileName="data/practice.sqlite3"):
+    from FileManagment import FileManagement
+    fileMang = FileManagement()
+    storage = SqliteStorage(fileName)
+    try:
+        words = fileMang.readWordsFromJson()
+        phrasal_verbs = fileMang.readPhrasalVerbsFromJson()
+        storage.saveWords(words)
+        storage.savePhrasalVerbs(phrasal_verbs)
+    finally:
+        storage.close()
+        fileMang.close()
+    return len(words), len(phrasal_verbs)
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "data/practice.sqlite3"
+    words, phrasal_verbs = migrateFromJson(target)
+    print(f"Imported {words} words and {phrasal_verbs} phrasal verbs into {target}")
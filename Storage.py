@@ -0,0 +1,57 @@
+import os
+from Report import LIMIT, deckReport
+
+
+# Interface shared by the storage backends (FileManagement for JSON files,
+# SqliteStorage for a local SQLite database). Management only talks to these methods.
+class StorageBackend:
+    def readWords(self):
+        raise NotImplementedError
+
+    def readPhrasalVerbs(self):
+        raise NotImplementedError
+
+    def saveWords(self, words):
+        raise NotImplementedError
+
+    def savePhrasalVerbs(self, phrasal_verbs):
+        raise NotImplementedError
+
+    # Persist a single item right after it was answered
+    def recordWord(self, word):
+        raise NotImplementedError
+
+    def recordPhrasalVerb(self, phrasal_verb):
+        raise NotImplementedError
+
+    def resetWordScore(self):
+        raise NotImplementedError
+
+    def resetPhrasalVerbScore(self):
+        raise NotImplementedError
+
+    # Update the loaded decks with what other processes stored since and
+    # return the items that changed
+    def refresh(self):
+        return []
+
+    # Report aggregates of `items`, a deck read from this storage, as plain
+    # dicts (see Report.buildReport). Computed in memory and cached per deck.
+    def reportStats(self, items, key, limit=LIMIT):
+        return deckReport(items, key, limit)
+
+    # Release files and connections once the session is over
+    def close(self):
+        pass
+
+
+# STORAGE_BACKEND=json (default) or STORAGE_BACKEND=sqlite
+def createStorage(backend=None):
+    backend = backend or os.getenv("STORAGE_BACKEND", "json")
+    if backend == "sqlite":
+        from SqliteStorage import SqliteStorage
+        return SqliteStorage()
+    if backend == "json":
+        from FileManagment import FileManagement
+        return FileManagement()
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -1,33 +1,122 @@
-from gtts import gTTS
-import pyttsx3
 import os
+import shutil
+import subprocess
+from collections import deque
+
+# Speech libraries are imported on first use so starting the app doesn't pay for
+# engines that are never used
+
+
+# Command line players able to play a rendered clip, in order of preference
+def findPlayer():
+    if os.name != "posix":
+        return "start"
+    for player in ("play", "aplay", "ffplay"):
+        if shutil.which(player):
+            return player
+    return None
+
+
+def playAudioFile(path, player=None):
+    player = player or findPlayer()
+    if player == "start":
+        os.system(f'start "" "{path}"')
+    elif player == "ffplay":
+        subprocess.run([player, "-nodisp", "-autoexit", "-loglevel", "quiet", path])
+    elif player:
+        subprocess.run([player, "-q", path])
+
 
 class TextToSpeech:
+    # File extension of clips written by renderWord, None if the engine can't render to a file
+    audioExtension = None
+    # Items worth prefetching ahead of the current one; only AudioPipeline renders ahead
+    lookahead = 0
+
     def sayWord(wrod, language="en"):
         pass
 
+    # Synthesize `word` into the audio file at `path`
+    def renderWord(self, word, path):
+        raise NotImplementedError
+
+    # (engine, voice, language, rate) - everything besides the text that changes a rendered clip
+    def cacheKey(self):
+        raise NotImplementedError
+
+    def playFile(self, path):
+        playAudioFile(path)
+
+    # Texts that will be spoken soon, most urgent first
+    def prefetch(self, texts):
+        pass
+
+    def close(self):
+        pass
+
 
 class GTTS(TextToSpeech):
+    audioExtension = ".mp3"
+
     def __init__(self, language="en") -> None:
         super().__init__()
         self.language = language
 
-    def sayWord(self, word):
+    def renderWord(self, word, path):
+        from gtts import gTTS
         mySound = gTTS(text=word, lang=self.language, slow=False)
-        mySound.save("audio/welcome.mp3")
-        cmdStr = ""
-        if os.name == "posix":
-            cmdStr = "play audio/welcome.mp3"
-        else:
-            cmdStr = "start audio/welcome.mp3"
-        os.system(cmdStr)
+        mySound.save(path)
+
+    def cacheKey(self):
+        return ("gtts", "default", self.language, "normal")
+
+    def sayWord(self, word):
+        if not os.path.exists("audio"):
+            os.makedirs("audio")
+        self.renderWord(word, "audio/welcome.mp3")
+        self.playFile("audio/welcome.mp3")
 
 
 class PYTTS(TextToSpeech):
+    audioExtension = ".wav"
+
     def __init__(self, language="en") -> None:
         super().__init__()
-        self.engine = pyttsx3.init()
+        self.language = language
+        self._engine = None
+        self._cacheKey = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+        return self._engine
+
+    def renderWord(self, word, path):
+        self.engine.save_to_file(word, path)
+        self.engine.runAndWait()
+
+    def cacheKey(self):
+        if self._cacheKey is None:
+            self._cacheKey = ("pyttsx3", self.engine.getProperty("voice"), self.language, self.engine.getProperty("rate"))
+        return self._cacheKey
 
     def sayWord(self, word):
         self.engine.say(word)
         self.engine.runAndWait()
+
+
+# Silent engine for headless sessions and benchmarks. Keeps what would have
+# been spoken, the most recent `limit` texts (all when None)
+class RecordingTTS(TextToSpeech):
+    def __init__(self, limit=None) -> None:
+        super().__init__()
+        self.spoken = deque(maxlen=limit)
+
+    def sayWord(self, word):
+        self.spoken.append(word)
+
+    @property
+    def lastWord(self):
+        return self.spoken[-1] if self.spoken else None
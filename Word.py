@@ -1,7 +1,4 @@
-import syllapy
-from metaphone import doublemetaphone
-from nltk.corpus import words as corpus_words
-from nltk.probability import FreqDist
+from FrequencyIndex import getFrequencyIndex
 import Colors
 
 class Word:
@@ -9,8 +6,20 @@ class Word:
     CATEGORY_MASTERED = "mastered"      # Words the user consistently gets right
     CATEGORY_AVERAGE = "average"        # Words with average performance
     CATEGORY_STRUGGLING = "struggling"  # Words the user frequently gets wrong
+
+    # Decks hold hundreds of thousands of these, so no per-instance __dict__
+    __slots__ = ("word", "rightCount", "wrongCount", "asked", "streak", "difficulty", "_category",
+                 "ease", "interval", "repetitions", "dueAt", "deck",
+                 "syncedRight", "syncedWrong", "syncedAsked", "dirty")
+
+    # Spaced repetition (SM-2)
+    DEFAULT_EASE = 2.5
+    MIN_EASE = 1.3
+    SECONDS_PER_DAY = 24 * 60 * 60
     
-    def __init__(self, word, rightCount=0, wrongCount=0, asked=0, streak=0, difficulty=None, category=None) -> None:
+    def __init__(self, word, rightCount=0, wrongCount=0, asked=0, streak=0, difficulty=None, category=None,
+                 ease=None, interval=0, repetitions=0, dueAt=None) -> None:
+        self.deck = None
         self.word = word.lower().strip()
         self.rightCount = rightCount
         self.wrongCount = wrongCount
@@ -24,7 +33,52 @@ class Word:
         # Set category
         self.category = category if category else self.CATEGORY_AVERAGE
         self.update_category()
+
+        # Review schedule, dueAt is None until the first review
+        self.ease = ease if ease else self.DEFAULT_EASE
+        self.interval = interval
+        self.repetitions = repetitions
+        self.dueAt = dueAt
+        self.markSynced()
     
+    # Every category change is reported to the owning Deck so its per-category buckets stay current
+    @property
+    def category(self):
+        return self._category
+
+    @category.setter
+    def category(self, category):
+        old = getattr(self, "_category", None)
+        self._category = category
+        if old != category:
+            if self.deck is not None:
+                self.deck.categoryChanged(self, old, category)
+            self.markDirty()
+
+    # Changed since storage last saved it: set by answers and category changes,
+    # cleared by storage. The owning Deck keeps the set of dirty items.
+    def markDirty(self):
+        self.dirty = True
+        if self.deck is not None:
+            self.deck.itemChanged(self)
+
+    def markClean(self):
+        if self.deck is not None:
+            self.deck.markClean(self)
+        else:
+            self.dirty = False
+
+    # Counts one spelling attempt
+    def recordAnswer(self, correct):
+        self.asked += 1
+        if correct:
+            self.rightCount += 1
+            self.streak += 1
+        else:
+            self.wrongCount += 1
+            self.streak = 0
+        self.markDirty()
+
     def update_category(self):
         if self.asked < 3:
             # Not enough data to categorize yet
@@ -79,18 +133,17 @@ class Word:
 
     # Difficulty based on phonetics (using metaphone)
     def calculate_difficulty_by_phonetics(self):
+        from metaphone import doublemetaphone
         primary, secondary = doublemetaphone(self.word)
         if len(primary) > 4 or len(secondary) > 4:
             return 4  # Harder
         return 2  # Easier
 
-    # Difficulty based on frequency
+    # Difficulty based on usage frequency (see FrequencyIndex)
     def calculate_difficulty_by_frequency(self):
-        word_list = corpus_words.words()
-        frequency = FreqDist(word_list)
-        if self.word not in frequency:
+        word_freq = getFrequencyIndex().frequency(self.word)
+        if word_freq is None:
             return 4  # Word is rare or unknown, hence difficult
-        word_freq = frequency[self.word]
         if word_freq > 100:
             return 1  # Common word
         elif word_freq > 50:
@@ -100,6 +153,7 @@ class Word:
 
     # Difficulty based on syllables
     def calculate_difficulty_by_syllables(self):
+        import syllapy
         syllables = syllapy.count(self.word)
         if syllables <= 2:
             return 1  # Easy
@@ -108,6 +162,23 @@ class Word:
         else:
             return 3  # Hard
         
+    # SM-2 update after an answer graded 0 (forgot) to 5 (perfect recall)
+    def review(self, quality, now):
+        if quality < 3:
+            self.repetitions = 0
+            self.interval = 1
+        else:
+            self.repetitions += 1
+            if self.repetitions == 1:
+                self.interval = 1
+            elif self.repetitions == 2:
+                self.interval = 6
+            else:
+                self.interval = round(self.interval * self.ease)
+        self.ease = max(self.MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        self.dueAt = now + self.interval * self.SECONDS_PER_DAY
+        self.markDirty()
+
     def getPercentage(self):
         if self.asked == 0:
             return 0
@@ -127,6 +198,65 @@ class Word:
         weighted_performance = self.getPercentage() * streak_bonus * difficulty_factor * category_factor
         return min(weighted_performance, 100)  # Cap it at 100%
     
+    # Sort key equivalent to Word.cmp: struggling first, mastered last,
+    # then by weighted performance and streak
+    def priorityKey(self):
+        if self.category == self.CATEGORY_STRUGGLING:
+            rank = 0
+        elif self.category == self.CATEGORY_MASTERED:
+            rank = 2
+        else:
+            rank = 1
+        return (rank, self.getWeightedPerformance(), self.streak)
+
+    # Pickled (see Snapshot.py) as a flat tuple of the slots: restoring it is a
+    # single unpacking, without the constructor's difficulty and category work
+    def __getstate__(self):
+        return (self.word, self.rightCount, self.wrongCount, self.asked, self.streak, self.difficulty, self._category,
+                self.ease, self.interval, self.repetitions, self.dueAt, self.deck,
+                self.syncedRight, self.syncedWrong, self.syncedAsked, self.dirty)
+
+    def __setstate__(self, state):
+        (self.word, self.rightCount, self.wrongCount, self.asked, self.streak, self.difficulty, self._category,
+         self.ease, self.interval, self.repetitions, self.dueAt, self.deck,
+         self.syncedRight, self.syncedWrong, self.syncedAsked, self.dirty) = state
+
+    # Counter changes storage hasn't seen yet, as [right, wrong, asked]. Storage
+    # merges these deltas rather than overwriting the counters, so answers from
+    # several processes add up.
+    def unsyncedCounts(self):
+        return [self.rightCount - self.syncedRight, self.wrongCount - self.syncedWrong, self.asked - self.syncedAsked]
+
+    def markSynced(self):
+        self.syncedRight, self.syncedWrong, self.syncedAsked = self.rightCount, self.wrongCount, self.asked
+
+    # Counts another process stored, added on top of ours. Storage already has
+    # them, so the item stays clean, but the deck's generation moves on.
+    def addStoredCounts(self, right, wrong, asked):
+        self.rightCount += right
+        self.wrongCount += wrong
+        self.asked += asked
+        self.syncedRight += right
+        self.syncedWrong += wrong
+        self.syncedAsked += asked
+        if self.deck is not None:
+            self.deck.touch()
+
+    def toDict(self):
+        return {
+            "word": self.word,
+            "rightCount": self.rightCount,
+            "wrongCount": self.wrongCount,
+            "asked": self.asked,
+            "streak": self.streak,
+            "difficulty": self.difficulty,
+            "category": self.category,
+            "ease": self.ease,
+            "interval": self.interval,
+            "repetitions": self.repetitions,
+            "dueAt": self.dueAt
+        }
+
     def __str__(self) -> str:
         retuStr = ""
         if self.asked > 0:
@@ -0,0 +1,43 @@
+import argparse
+import json
+import sys
+
+
+def loadResults(fileName):
+    with open(fileName) as f:
+        return json.load(f)["results"]
+
+
+# (name, baseline, current, ratio, slower) for every benchmark in both runs
+def compare(baseline, current, threshold):
+    rows = []
+    for name in sorted(baseline.keys() & current.keys()):
+        ratio = current[name] / baseline[name] if baseline[name] else float("inf")
+        rows.append((name, baseline[name], current[name], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark suite result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="flag benchmarks slower by more than this fraction")
+    args = parser.parse_args()
+
+    baseline, current = loadResults(args.baseline), loadResults(args.current)
+    rows = compare(baseline, current, args.threshold)
+    print(f"{'benchmark':32} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for name, old, new, ratio, slower in rows:
+        flag = "  SLOWER" if slower else ""
+        print(f"{name:32} {old * 1000:12.3f} {new * 1000:12.3f} {(ratio - 1) * 100:+7.1f}%{flag}")
+    for name in sorted(baseline.keys() ^ current.keys()):
+        print(f"{name:32} only in {'baseline' if name in baseline else 'current'}")
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
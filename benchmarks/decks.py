@@ -0,0 +1,41 @@
+import random
+import string
+
+from Word import Word
+from PhrasalVerb import PhrasalVerb
+
+PARTICLES = ["up", "down", "out", "off", "in", "on", "over", "away", "back", "through"]
+
+
+def randomSpelling(rng, low=3, high=12):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+# Random practice history so every category and streak length shows up
+def randomStats(rng):
+    asked = rng.randint(0, 30)
+    rightCount = rng.randint(0, asked)
+    wrongCount = asked - rightCount
+    streak = rng.randint(0, rightCount)
+    difficulty = rng.uniform(1, 5)
+    return rightCount, wrongCount, asked, streak, difficulty
+
+
+# Difficulty is pre-filled so building large decks doesn't hit the NLTK/phonetics scoring
+def syntheticWords(count, seed=0):
+    rng = random.Random(seed)
+    return [Word(f"{randomSpelling(rng)}{i}", *randomStats(rng)) for i in range(count)]
+
+
+def syntheticPhrasalVerbs(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        PhrasalVerb(f"{randomSpelling(rng, 2, 8)}{i} {rng.choice(PARTICLES)}", *randomStats(rng))
+        for i in range(count)
+    ]
+
+
+# Stand-in for processWord/processPhrasalVerb without input() or TTS
+def simulateAnswer(item, rng, accuracy=0.8):
+    item.recordAnswer(rng.random() < accuracy)
+    item.update_category()
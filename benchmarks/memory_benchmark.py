@@ -0,0 +1,30 @@
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.decks import syntheticWords, syntheticPhrasalVerbs
+
+
+# Bytes allocated per item while building a deck of `size` items (spellings included)
+def bytesPerItem(build, size):
+    gc.collect()
+    tracemalloc.start()
+    deck = build(size)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del deck
+    return current / size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory used per Word / PhrasalVerb in large decks")
+    parser.add_argument("--size", type=int, default=1000000)
+    args = parser.parse_args()
+
+    print(f"deck size: {args.size}")
+    print(f"Word:        {bytesPerItem(syntheticWords, args.size):8.1f} bytes/item")
+    print(f"PhrasalVerb: {bytesPerItem(syntheticPhrasalVerbs, args.size):8.1f} bytes/item")
+
+
+if __name__ == "__main__":
+    main()
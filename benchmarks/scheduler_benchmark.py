@@ -0,0 +1,50 @@
+import argparse
+import random
+import time
+from functools import cmp_to_key
+
+from Word import Word
+from Scheduler import Scheduler
+from benchmarks.decks import syntheticWords, simulateAnswer
+
+
+# The selection step wordLoop used before Scheduler: a full cmp sort every turn
+def sortedTurns(words, turns, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(turns):
+        temp = sorted(words, key=cmp_to_key(Word.cmp))
+        chosen = temp[0] if rng.random() < 0.7 and temp else rng.choice(words)
+        simulateAnswer(chosen, rng)
+    return turns / (time.perf_counter() - start)
+
+
+def heapTurns(words, turns, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    scheduler = Scheduler(words, rng)
+    for _ in range(turns):
+        chosen = scheduler.next()
+        simulateAnswer(chosen, rng)
+        scheduler.update(chosen)
+    return turns / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-turn selection throughput of Scheduler against re-sorting")
+    parser.add_argument("--size", type=int, default=50000, help="number of words in the deck")
+    parser.add_argument("--sorted-turns", type=int, default=20)
+    parser.add_argument("--heap-turns", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    old = sortedTurns(syntheticWords(args.size, args.seed), args.sorted_turns, args.seed)
+    new = heapTurns(syntheticWords(args.size, args.seed), args.heap_turns, args.seed)
+    print(f"deck size: {args.size}")
+    print(f"sorted every turn: {old:10.1f} turns/s")
+    print(f"heap scheduler:    {new:10.1f} turns/s (includes building the heap)")
+    print(f"speedup:           {new / old:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
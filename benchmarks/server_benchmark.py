@@ -0,0 +1,177 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from DurableWriter import GroupCommit
+from FileManagment import FileManagement, runCommit
+from benchmarks.decks import syntheticWords
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sortedValues, fraction):
+    return sortedValues[min(int(len(sortedValues) * fraction), len(sortedValues) - 1)]
+
+
+# One keep-alive HTTP/1.1 connection to the practice server
+class Client:
+    def __init__(self, host, port) -> None:
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+# A learner practicing until `deadline`: asks for the next word and spells it
+# right with probability `accuracy`, retrying after a miss like in the app.
+# Appends each request's latency and returns the number of errors.
+async def learner(host, port, userId, deadline, accuracy, rng, latencies):
+    client = Client(host, port)
+    errors = 0
+    try:
+        await client.connect()
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, item = await client.request("GET", f"/users/{userId}/next")
+            latencies.append(time.perf_counter() - start)
+            if status != 200 or item.get("item") is None:
+                errors += 1
+                continue
+            while time.perf_counter() < deadline:
+                answer = item["item"] if rng.random() < accuracy else item["item"][:-1]
+                start = time.perf_counter()
+                status, result = await client.request("POST", f"/users/{userId}/answer", {"answer": answer})
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors += 1
+                    break
+                if result["correct"]:
+                    break
+    except (ConnectionError, OSError, asyncio.IncompleteReadError):
+        errors += 1
+    finally:
+        client.close()
+    return errors
+
+
+async def runLearners(host, port, userIds, duration, accuracy, seed):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    errors = await asyncio.gather(*(
+        learner(host, port, userId, deadline, accuracy, random.Random(f"{seed}-{userId}"), latencies)
+        for userId in userIds
+    ))
+    return latencies, sum(errors)
+
+
+# Entry point of a load generating process
+def loadProcess(args):
+    host, port, userIds, duration, accuracy, seed = args
+    return asyncio.run(runLearners(host, port, userIds, duration, accuracy, seed))
+
+
+# Decks of `size` synthetic words for `users` learners, written straight to disk
+def createDecks(directory, users, size, seed):
+    writer = GroupCommit(FileManagement.COMMIT_DELAY, runCommit)
+    for user in range(users):
+        storage = FileManagement(f"{directory}/learner{user}", writer=writer)
+        storage.saveWords(syntheticWords(size, seed + user))
+        storage.flush()
+        storage.close()
+    writer.close()
+
+
+# Starts PracticeServer.py on a free port in `directory`; returns (process, host, port)
+def startServer(directory, maxSessions, seed):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_DIR, "PracticeServer.py"), "--port", "0", "--directory", "users",
+         "--max-sessions", str(maxSessions), "--seed", str(seed)],
+        cwd=directory, env=env, stdout=subprocess.PIPE, text=True,
+    )
+    for line in process.stdout:
+        if line.startswith("Serving on "):
+            url = urlsplit(line.split()[2])
+            # Keep reading what it prints so it never blocks on a full pipe
+            threading.Thread(target=process.stdout.read, daemon=True).start()
+            return process, url.hostname, url.port
+    raise RuntimeError("the practice server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests per second and tail latency of the practice server under many concurrent learners")
+    parser.add_argument("--url", help="benchmark a running server (its learners need decks) instead of starting one")
+    parser.add_argument("--users", type=int, default=1000, help="concurrent learners, one connection each")
+    parser.add_argument("--size", type=int, default=200, help="words per learner's deck")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--processes", type=int, default=2, help="load generating processes")
+    parser.add_argument("--accuracy", type=float, default=0.8, help="chance a learner spells a word right")
+    parser.add_argument("--max-sessions", type=int, default=2000, help="learners the started server keeps loaded")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    userIds = [f"learner{user}" for user in range(args.users)]
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port
+        else:
+            createDecks(os.path.join(directory, "users"), args.users, args.size, args.seed)
+            server, host, port = startServer(directory, args.max_sessions, args.seed)
+        try:
+            shares = [(host, port, userIds[i::args.processes], args.duration, args.accuracy, args.seed)
+                      for i in range(args.processes)]
+            start = time.perf_counter()
+            with multiprocessing.Pool(args.processes) as pool:
+                results = pool.map(loadProcess, shares)
+            elapsed = time.perf_counter() - start
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    latencies = sorted(latency for share, _ in results for latency in share)
+    errors = sum(errors for _, errors in results)
+    print(f"{args.users} learners, {len(latencies)} requests in {elapsed:.1f}s, {errors} errors")
+    if latencies:
+        print(f"requests/s:    {len(latencies) / elapsed:10.0f}")
+        print(f"p50 latency:   {percentile(latencies, 0.5) * 1e3:10.2f} ms")
+        print(f"p99 latency:   {percentile(latencies, 0.99) * 1e3:10.2f} ms")
+        print(f"p99.9 latency: {percentile(latencies, 0.999) * 1e3:10.2f} ms")
+        print(f"max latency:   {latencies[-1] * 1e3:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from Headless import headlessManagement, runTurns
+from Storage import createStorage
+from benchmarks.decks import syntheticWords, syntheticPhrasalVerbs
+
+
+# Bytes this process handed to write() so far (Linux /proc), None elsewhere
+def bytesWritten():
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def percentile(sortedValues, fraction):
+    return sortedValues[min(int(len(sortedValues) * fraction), len(sortedValues) - 1)]
+
+
+# Headless practice turns (select, ask, answer, re-schedule, persist) against a
+# synthetic deck; returns turns/s, per-turn latency percentiles and bytes written
+def runSession(turns, size, phrasalVerbs, accuracy, storage, seed):
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            backend = createStorage(storage)
+            if phrasalVerbs:
+                backend.savePhrasalVerbs(syntheticPhrasalVerbs(size, seed))
+            else:
+                backend.saveWords(syntheticWords(size, seed))
+            management = headlessManagement(backend, accuracy, seed=seed)
+
+            latencies = []
+            last = [0.0]
+
+            def onTurn(item):
+                now = time.perf_counter()
+                latencies.append(now - last[0])
+                last[0] = now
+
+            writtenBefore = bytesWritten()
+            start = last[0] = time.perf_counter()
+            runTurns(management, turns, phrasalVerbs, onTurn)
+            elapsed = time.perf_counter() - start
+            backend.close()
+            writtenAfter = bytesWritten()
+        finally:
+            os.chdir(cwd)
+
+    latencies.sort()
+    return {
+        "turns": turns,
+        "turnsPerSecond": turns / elapsed,
+        "p50": percentile(latencies, 0.5),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.fmean(latencies),
+        "bytesWritten": None if writtenBefore is None else writtenAfter - writtenBefore,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of headless practice turns with a simulated learner")
+    parser.add_argument("--turns", type=int, default=100000)
+    parser.add_argument("--size", type=int, default=10000, help="items in the synthetic deck")
+    parser.add_argument("--phrasal-verbs", action="store_true", help="practice phrasal verbs instead of words")
+    parser.add_argument("--accuracy", type=float, default=0.8, help="chance the learner spells an item right")
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = runSession(args.turns, args.size, args.phrasal_verbs, args.accuracy, args.storage, args.seed)
+    print(f"{result['turns']} turns, deck of {args.size}, {args.storage} storage")
+    print(f"turns/s:       {result['turnsPerSecond']:10.0f}")
+    print(f"p50 latency:   {result['p50'] * 1e6:10.1f} us")
+    print(f"p99 latency:   {result['p99'] * 1e6:10.1f} us")
+    if result["bytesWritten"] is None:
+        print("bytes written:        n/a (needs /proc/self/io)")
+    else:
+        print(f"bytes written: {result['bytesWritten']:10d} ({result['bytesWritten'] / result['turns']:.0f} per turn)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import argparse
+import gc
+import itertools
+import os
+import random
+import resource
+import sys
+import tempfile
+
+from AudioPipeline import AudioPipeline
+from FileManagment import FileManagement
+from Headless import discard
+from TextToSpeech import RecordingTTS
+from benchmarks.decks import syntheticWords, syntheticPhrasalVerbs
+
+
+# Feeds input() with menu actions; every practice or add loop is left with
+# Ctrl-C, like a user would. Once `actions` menu actions were dispatched it
+# presses Ctrl-C at the menu, which saves and exits.
+class ScriptedUser:
+    # Menu choices the soak cycles through (5, clear console, is left out)
+    SCRIPT = ["1", "8", "4", "2", "9", "1", "7", "6", "10", "x", "8"]
+
+    def __init__(self, management, speech, actions, rng, checkpoint) -> None:
+        self.management = management
+        self.speech = speech
+        self.actions = actions
+        self.rng = rng
+        self.checkpoint = checkpoint
+        self.dispatched = 0
+        self.menu = itertools.cycle(self.SCRIPT)
+        self.pending = []
+        self.menuDepths = set()
+
+    def __call__(self, prompt=""):
+        if prompt.startswith("Press 1"):
+            # A session that ran out of items comes back before its script ends
+            self.pending = []
+            return self.menuAction()
+        if self.pending:
+            answer = self.pending.pop(0)
+            if answer is KeyboardInterrupt:
+                raise KeyboardInterrupt
+            return answer() if callable(answer) else answer
+        raise AssertionError(f"unexpected prompt: {prompt!r}")
+
+    def answer(self):
+        if self.rng.random() < 0.8:
+            return self.speech.lastWord
+        return "wrong"
+
+    def menuAction(self):
+        self.menuDepths.add(stackDepth())
+        if self.dispatched == self.actions:
+            raise KeyboardInterrupt
+        self.dispatched += 1
+        if self.dispatched % self.checkpoint == 0:
+            self.management.soakSamples.append(peakMemory())
+        choice = next(self.menu)
+        if choice in ("1", "8"):
+            # category (struggling, average, mastered, all or due), a few turns, then Ctrl-C
+            self.pending = [self.rng.choice("12345")] + [self.answer] * self.rng.randint(1, 4) + [KeyboardInterrupt]
+        elif choice == "2":
+            self.pending = [self.rng.choice(self.management.words).word]
+        elif choice == "9":
+            self.pending = [self.rng.choice(self.management.phrasal_verbs).phrasal_verb]
+        elif choice in ("6", "10"):
+            self.pending = [KeyboardInterrupt]
+        return choice
+
+
+# Peak resident set size in bytes (ru_maxrss is KB on Linux, bytes on macOS);
+# unlike tracemalloc it costs nothing while the soak runs
+def peakMemory():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def stackDepth():
+    depth = 0
+    frame = sys._getframe()
+    while frame:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+# Drives `actions` menu actions through Management.mainSystemLoop and returns
+# the menu stack depths seen and the peak memory at every checkpoint
+def soak(actions, size, checkpoint, seed):
+    from Brain import Management
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        storage = FileManagement()
+        storage.saveWords(syntheticWords(size, seed))
+        storage.savePhrasalVerbs(syntheticPhrasalVerbs(size, seed))
+
+        speech = RecordingTTS(limit=1)
+        management = Management(storage, AudioPipeline(speech), output=discard)
+        management.soakSamples = []
+        user = ScriptedUser(management, speech, actions, random.Random(seed), checkpoint)
+        management.input = user
+        gc.collect()
+        try:
+            management.mainSystemLoop()
+        except SystemExit:
+            pass
+        finally:
+            os.chdir(cwd)
+    return user.dispatched, user.menuDepths, management.soakSamples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak the main menu with scripted actions and check stack and memory stay flat")
+    parser.add_argument("--actions", type=int, default=100000)
+    parser.add_argument("--size", type=int, default=100, help="words and phrasal verbs in the synthetic decks")
+    parser.add_argument("--checkpoint", type=int, default=10000, help="sample memory every N actions")
+    parser.add_argument("--max-growth-kb", type=float, default=1024, help="allowed peak growth after the first checkpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    dispatched, depths, samples = soak(args.actions, args.size, args.checkpoint, args.seed)
+    print(f"menu actions: {dispatched}")
+    print(f"menu stack depths: {sorted(depths)}")
+    print("peak memory (KB): " + ", ".join(f"{sample / 1024:.0f}" for sample in samples))
+    growth = (max(samples) - samples[0]) / 1024 if samples else 0.0
+    print(f"growth after first checkpoint: {growth:.0f} KB")
+    if len(depths) != 1:
+        sys.exit("FAIL: the menu stack depth changed during the session")
+    if growth > args.max_growth_kb:
+        sys.exit(f"FAIL: memory grew by more than {args.max_growth_kb:.0f} KB")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(REPO_DIR, "main.py")
+BASELINE_FILE = os.path.join(REPO_DIR, "benchmarks", "results", "startup_baseline.json")
+FIRST_MENU_LINE = "Press 1 to start a word training session"
+
+
+# Seconds from launching main.py until the main menu is printed
+def timeToFirstMenu(workDir):
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-u", MAIN],
+        cwd=workDir,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    try:
+        for line in process.stdout:
+            if FIRST_MENU_LINE in line:
+                return time.perf_counter() - start
+        raise RuntimeError("main.py exited before showing the menu")
+    finally:
+        process.kill()
+        process.wait()
+
+
+# Slowest modules (cumulative microseconds) reported by `python -X importtime`
+def importTimes(workDir, top=10):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import Brain"],
+        cwd=workDir,
+        env=dict(os.environ, PYTHONPATH=REPO_DIR),
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time-to-first-menu and fail on regressions")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown over the baseline (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workDir:
+        samples = [timeToFirstMenu(workDir) for _ in range(args.runs)]
+        imports = importTimes(workDir)
+
+    median = statistics.median(samples)
+    print(f"time to first menu: median {median * 1000:.1f} ms over {args.runs} runs (min {min(samples) * 1000:.1f} ms)")
+    print("slowest imports (cumulative):")
+    for cumulative, name in imports:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(BASELINE_FILE), exist_ok=True)
+        with open(BASELINE_FILE, "w") as f:
+            json.dump({"timeToFirstMenu": median}, f)
+        print(f"baseline written to {BASELINE_FILE}")
+        return 0
+
+    if not os.path.exists(BASELINE_FILE):
+        print("no baseline yet, run with --update-baseline to create one")
+        return 0
+    with open(BASELINE_FILE) as f:
+        baseline = json.load(f)["timeToFirstMenu"]
+    limit = baseline * (1 + args.tolerance)
+    if median > limit:
+        print(f"REGRESSION: {median * 1000:.1f} ms > {limit * 1000:.1f} ms (baseline {baseline * 1000:.1f} ms)")
+        return 1
+    print(f"ok: within {args.tolerance:.0%} of baseline {baseline * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
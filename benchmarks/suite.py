@@ -0,0 +1,135 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from FileManagment import FileManagement
+from Headless import headlessManagement
+from Report import buildReport
+from Scheduler import Scheduler
+from Word import Word
+from benchmarks.decks import syntheticWords, syntheticPhrasalVerbs, simulateAnswer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+SELECTION_TURNS = 10000
+# Items put in the wrong category before each recategorizeWords run
+MISCATEGORIZED = 100
+
+
+# Fastest of `repeat` runs, in seconds; `setup` runs untimed before each
+def best(function, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+# Seconds per wordLoop selection step: pick, look ahead for prefetching, re-key
+def selectionStep(words, seed):
+    rng = random.Random(seed)
+    scheduler = Scheduler(words, rng)
+    turns = min(SELECTION_TURNS, 10 * len(words))
+    start = time.perf_counter()
+    for _ in range(turns):
+        word = scheduler.next()
+        scheduler.upcoming(3)
+        simulateAnswer(word, rng)
+        scheduler.update(word)
+    return (time.perf_counter() - start) / turns
+
+
+# Moves MISCATEGORIZED items of `items` to a category update_category would not give them
+def miscategorize(items, rng):
+    for item in rng.sample(items.items, min(MISCATEGORIZED, len(items))):
+        item.category = Word.CATEGORY_MASTERED if item.category == Word.CATEGORY_STRUGGLING else Word.CATEGORY_STRUGGLING
+
+
+# {benchmark name: seconds} for decks of `size` words and `size` phrasal verbs
+def benchmarkSize(size, repeat, seed):
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            storage = FileManagement()
+            words = syntheticWords(size, seed)
+            phrasal_verbs = syntheticPhrasalVerbs(size, seed)
+            # Saves are group committed: time them until the files are on disk
+            results["saveWords"] = best(lambda: (storage.saveWords(words), storage.flush()), repeat)
+            results["savePhrasalVerbs"] = best(lambda: (storage.savePhrasalVerbs(phrasal_verbs), storage.flush()), repeat)
+            del words, phrasal_verbs
+            results["readWordsFromJson"] = best(storage.readWordsFromJson, repeat)
+            results["readPhrasalVerbsFromJson"] = best(storage.readPhrasalVerbsFromJson, repeat)
+
+            management = headlessManagement(storage, seed=seed)
+            results["schedulerBuild"] = best(lambda: Scheduler(management.words, management.rng), repeat)
+            results["selectionStep"] = selectionStep(management.words, seed)
+            # miniReport is cached until the deck changes; buildReport is the uncached pass
+            results["miniReport"] = best(management.miniReport, repeat)
+            results["buildReport"] = best(lambda: buildReport(management.words, "word"), repeat)
+            # Timed until the changed items are stored
+            rng = random.Random(seed)
+            results["recategorizeWords"] = best(
+                lambda: (management.recategorizeWords(), storage.flush()), repeat,
+                setup=lambda: miscategorize(management.words, rng),
+            )
+            storage.close()
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def gitRevision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time load, save, selection, report and recategorize on synthetic decks")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="comma separated deck sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the fastest is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/suite-<time>.json)")
+    args = parser.parse_args()
+
+    report = {
+        "revision": gitRevision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "repeat": args.repeat,
+        "results": {},
+    }
+    for size in (int(size) for size in args.sizes.split(",")):
+        for name, seconds in benchmarkSize(size, args.repeat, args.seed).items():
+            key = f"{name}/{size}"
+            report["results"][key] = seconds
+            print(f"{key:32} {seconds * 1000:12.3f} ms", flush=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"suite-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    directory = os.path.dirname(output)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
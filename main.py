@@ -1,8 +1,11 @@
+import Instrumentation
 from Brain import Management
 
 from signal import signal, SIGINT
 
 if __name__ == "__main__":
+    if Instrumentation.PROFILE:
+        Instrumentation.startProfiler()
     p = Management()
     signal(SIGINT, p.saveOnExit)
     p.mainSystemLoop()
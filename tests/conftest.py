@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Runs the test in an empty directory, so relative paths like data/ stay in it
+@pytest.fixture
+def workDir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
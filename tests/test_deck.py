@@ -0,0 +1,68 @@
+from Deck import Deck
+from Word import Word
+
+
+def words(*texts):
+    return [Word(text, difficulty=1.0) for text in texts]
+
+
+def answer(word, correct, times):
+    for _ in range(times):
+        word.recordAnswer(correct)
+    word.update_category()
+
+
+def test_buckets_follow_category_changes():
+    deck = Deck(words("apple", "pear", "plum"))
+    assert deck.count(Word.CATEGORY_AVERAGE) == 3
+    apple, pear = deck.find("apple"), deck.find("pear")
+    answer(apple, False, 3)
+    answer(pear, True, 5)
+    assert deck.bucket(Word.CATEGORY_STRUGGLING) == [apple]
+    assert deck.bucket(Word.CATEGORY_MASTERED) == [pear]
+    assert deck.bucket(Word.CATEGORY_AVERAGE) == [deck.find("plum")]
+
+    removed = deck.remove("apple")
+    assert removed is apple and removed.deck is None
+    assert deck.count(Word.CATEGORY_STRUGGLING) == 0
+    # Changes to a removed item no longer reach the deck
+    removed.category = Word.CATEGORY_MASTERED
+    assert deck.bucket(Word.CATEGORY_MASTERED) == [pear]
+
+
+def test_spelling_index_survives_remove_and_replace():
+    deck = Deck(words("apple", "pear", "plum"))
+    assert not deck.append(Word(" Apple ", difficulty=1.0))
+    assert "APPLE" in deck and len(deck) == 3
+    deck.remove("apple")
+    # The last item moved into the free slot and can still be found
+    assert [word.word for word in deck] == ["plum", "pear"]
+    assert deck.find("plum") is deck[0]
+
+    old = deck.find("pear")
+    new = Word("pear", rightCount=4, asked=4, streak=4, difficulty=1.0)
+    deck.replace(new)
+    assert deck.find("pear") is new and old.deck is None
+    assert deck.bucket(Word.CATEGORY_AVERAGE) == [deck.find("plum"), new]
+
+
+def test_dirty_items_and_generation():
+    deck = Deck(words("apple", "pear"))
+    deck.markClean()
+    assert deck.dirty == {} and not deck.restructured
+    generation = deck.generation
+
+    apple = deck.find("apple")
+    apple.recordAnswer(True)
+    assert list(deck.dirty) == [apple] and apple.dirty
+    assert deck.generation > generation
+
+    deck.markClean(apple)
+    assert deck.dirty == {} and not apple.dirty
+    deck.find("pear").review(4, 0.0)
+    assert list(deck.dirty) == [deck.find("pear")]
+
+    deck.remove("pear")
+    assert deck.dirty == {} and deck.restructured
+    deck.markClean()
+    assert not deck.restructured
@@ -0,0 +1,59 @@
+from DueQueue import DueQueue
+from FileManagment import FileManagement
+from Headless import headlessManagement, ScriptedInput
+from Word import Word
+
+
+def reviewed(text, dueAt):
+    word = Word(text, difficulty=1.0)
+    word.dueAt = dueAt
+    return word
+
+
+def test_next_due_is_the_earliest_due_item():
+    words = [reviewed("late", 300.0), reviewed("early", 100.0), Word("new", difficulty=1.0)]
+    queue = DueQueue(words)
+    assert len(queue) == 2
+    assert queue.nextDue(50.0) is None
+    assert queue.nextDue(150.0) is words[1]
+    words[1].dueAt = 500.0
+    queue.update(words[1])
+    assert queue.nextDue(400.0) is words[0]
+
+
+def test_items_changed_behind_the_queue_are_skipped_or_requeued():
+    words = [reviewed("a", 100.0), reviewed("b", 200.0), reviewed("c", 300.0)]
+    queue = DueQueue(words)
+    # Reset without update(): no longer scheduled at all
+    words[0].dueAt = None
+    # Rescheduled without update(): queued again under its new time
+    words[1].dueAt = 400.0
+    assert queue.nextDue(350.0) is words[2]
+    assert queue.nextDue(450.0) is words[2]
+    assert len(queue) == 2
+
+
+def test_due_session_after_a_score_reset(workDir):
+    storage = FileManagement("data")
+    management = headlessManagement(storage, seed=1)
+    management.words.append(Word("apple", difficulty=1.0))
+    management.input = ScriptedInput(["apple"])
+    management.processWord(management.words.find("apple"))
+    assert len(management.wordsDue) == 1
+
+    management.resetWordScore()
+    assert len(management.wordsDue) == 0
+    assert management.wordsDue.nextDue(float("inf")) is None
+    storage.close()
+
+
+def test_equal_due_times_with_unscheduled_items():
+    words = [Word("new", difficulty=1.0), Word("newer", difficulty=1.0), reviewed("a", 100.0)]
+    queue = DueQueue(words)
+    # Items scheduled later must not share a tie-breaker with queued ones,
+    # or the heap ends up comparing the items themselves
+    for word in words[:2]:
+        word.dueAt = 100.0
+        queue.update(word)
+    assert len(queue) == 3
+    assert queue.nextDue(100.0) is words[2]
@@ -0,0 +1,143 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+import Snapshot
+from FileManagment import FileManagement
+from Journal import Journal
+from Word import Word
+
+WORDS = ["apple", "pear", "plum"]
+
+
+def newStorage(directory="data"):
+    storage = FileManagement(directory)
+    storage.readWords()
+    storage.readPhrasalVerbs()
+    return storage
+
+
+def seed(directory="data"):
+    storage = newStorage(directory)
+    for text in WORDS:
+        storage.words.append(Word(text, difficulty=1.0))
+    storage.saveDeck(storage.words, storage.wordFiles)
+    storage.flush()
+    storage.close()
+
+
+def answer(storage, text, correct=True):
+    item = storage.words.find(text)
+    item.recordAnswer(correct)
+    storage.recordWord(item)
+
+
+def storedCounts(directory="data"):
+    storage = newStorage(directory)
+    counts = {item.word: (item.rightCount, item.wrongCount, item.asked) for item in storage.words}
+    storage.close()
+    return counts
+
+
+def test_saves_of_two_sessions_add_up(workDir):
+    seed()
+    first, second = newStorage(), newStorage()
+    answer(first, "apple")
+    answer(second, "apple", correct=False)
+    answer(second, "pear")
+    # Whole-deck saves merge into what the other session stored meanwhile
+    first.saveDeck(first.words, first.wordFiles)
+    second.saveDeck(second.words, second.wordFiles)
+    first.flush()
+    second.flush()
+    assert storedCounts()["apple"] == (1, 1, 2)
+    assert storedCounts()["pear"] == (1, 0, 1)
+
+    # Each session picks up the other's answers on refresh
+    first.refresh()
+    second.refresh()
+    assert first.words.find("apple").asked == second.words.find("apple").asked == 2
+    first.close()
+    second.close()
+
+
+def practice(args):
+    directory, worker, turns = args
+    FileManagement.COMPACT_AFTER = 7
+    storage = newStorage(directory)
+    for turn in range(turns):
+        storage.refresh()
+        answer(storage, WORDS[(worker + turn) % len(WORDS)], correct=turn % 3 != 0)
+        if turn % 50 == 0:
+            storage.saveWords(storage.words)
+    storage.close()
+
+
+def test_concurrent_processes_lose_no_answers(workDir):
+    seed()
+    workers, turns = 3, 200
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        pool.map(practice, [("data", worker, turns) for worker in range(workers)])
+    counts = storedCounts()
+    assert sum(asked for _, _, asked in counts.values()) == workers * turns
+    assert sum(right for right, _, _ in counts.values()) == workers * sum(turn % 3 != 0 for turn in range(turns))
+
+
+def test_compaction_folds_the_journal_into_the_deck(workDir):
+    seed()
+    storage = newStorage()
+    storage.COMPACT_AFTER = 5
+    for _ in range(12):
+        answer(storage, "plum")
+    storage.flush()
+    # Two compactions happened: only the answers after the last one are left
+    records, _ = storage.wordsJournal.read()
+    assert len(records) < 5
+    with open("data/words.json") as f:
+        stored = {state["word"]: state for state in json.load(f)["items"]}
+    assert stored["plum"]["asked"] == 12 - len(records)
+    storage.close()
+    assert storedCounts()["plum"] == (12, 0, 12)
+
+
+@pytest.mark.parametrize("withSnapshot", [True, False])
+def test_crash_before_the_journal_is_trimmed_does_not_count_twice(workDir, monkeypatch, withSnapshot):
+    seed()
+    storage = newStorage()
+    for _ in range(3):
+        answer(storage, "apple")
+    storage.flush()
+    # The process dies after installing the merged deck file, before the
+    # journal records it contains are dropped
+    with monkeypatch.context() as patch:
+        patch.setattr(Journal, "dropBefore", lambda self, offset: None)
+        storage.saveDeck(storage.words, storage.wordFiles)
+        storage.flush()
+    records, _ = storage.wordsJournal.read()
+    assert len(records) == 3
+    if not withSnapshot:
+        os.remove(Snapshot.snapshotFileName("data/words.json"))
+    assert storedCounts()["apple"] == (3, 0, 3)
+
+    # Later answers after the mark still count, and the next commit trims the journal
+    recovered = newStorage()
+    answer(recovered, "apple")
+    recovered.saveDeck(recovered.words, recovered.wordFiles)
+    recovered.flush()
+    recovered.close()
+    assert Journal("data/words.journal").read()[0] == []
+    assert storedCounts()["apple"] == (4, 0, 4)
+
+
+def test_snapshot_is_ignored_when_the_json_changes_behind_it(workDir):
+    seed()
+    with open("data/words.json", "rb") as f:
+        data = f.read()
+    stat = os.stat("data/words.json")
+    # Same size and mtime, different contents
+    with open("data/words.json", "wb") as f:
+        f.write(data.replace(b'"rightCount": 0', b'"rightCount": 7', 1))
+    os.utime("data/words.json", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert storedCounts()["apple"][0] == 7
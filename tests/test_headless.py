@@ -0,0 +1,22 @@
+import random
+
+from Brain import Management
+from FileManagment import FileManagement
+from Headless import SimulatedLearner, discard, runTurns
+from TextToSpeech import RecordingTTS
+from Word import Word
+
+
+# Any TextToSpeech works as the sound engine, not just an AudioPipeline
+def test_management_with_a_bare_recording_engine(workDir):
+    speech = RecordingTTS()
+    learner = SimulatedLearner(speech, 0.8, 0.0, random.Random(1))
+    storage = FileManagement("data")
+    management = Management(storage, speech, learner, discard)
+    for text in ("apple", "pear", "plum"):
+        management.words.append(Word(text, difficulty=1.0))
+    runTurns(management, 20)
+    assert len(speech.spoken) >= 20
+    assert sum(word.asked for word in management.words) >= 20
+    management.soundEngine.close()
+    storage.close()
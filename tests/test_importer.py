@@ -0,0 +1,19 @@
+import Importer
+from FileManagment import FileManagement
+
+
+def test_import_streams_batches_and_skips_known_entries(workDir, monkeypatch):
+    monkeypatch.setattr(Importer, "BATCH_SIZE", 7)
+    with open("words.txt", "w") as f:
+        f.write("\n".join(["Apple", "pear", "apple", " plum "] + [f"word{i}" for i in range(40)]))
+
+    added, _ = Importer.importFile("words.txt", processes=2)
+    assert added == 43
+    added, _ = Importer.importFile("words.txt", processes=2)
+    assert added == 0
+
+    storage = FileManagement()
+    words = storage.readWords()
+    assert len(words) == 43
+    assert "plum" in words and "word39" in words
+    storage.close()
@@ -0,0 +1,57 @@
+from Journal import Journal
+
+
+def record(text, delta):
+    return {"word": text, "delta": delta, "writer": "test"}
+
+
+def test_replay_returns_complete_records_in_order(workDir):
+    journal = Journal("words.journal")
+    journal.append(record("apple", [1, 0, 1]))
+    journal.append(record("pear", [0, 1, 1]))
+    # A torn last line, as a crash in the middle of an append leaves it
+    with open("words.journal", "a") as f:
+        f.write('{"word": "plu')
+    records, end = journal.replay()
+    assert [r["word"] for r in records] == ["apple", "pear"]
+    assert end < journal.size()
+
+    # The torn line is terminated before the next record
+    journal.close()
+    journal.append(record("plum", [1, 0, 1]))
+    records, _ = journal.replay()
+    assert [r["word"] for r in records] == ["apple", "pear", "plum"]
+    journal.close()
+
+
+def test_replay_skips_what_the_deck_file_has(workDir):
+    journal = Journal("words.journal")
+    _, end = journal.append(record("apple", [1, 0, 1]))
+    journal.append(record("pear", [0, 1, 1]))
+    mark = (journal.id(), end)
+    records, _ = journal.replay(mark)
+    assert [r["word"] for r in records] == ["pear"]
+    # A mark into another journal file says nothing about this one
+    records, _ = journal.replay(("elsewhere", end))
+    assert [r["word"] for r in records] == ["apple", "pear"]
+    journal.close()
+
+
+def test_drop_before_keeps_the_tail_under_a_new_id(workDir):
+    journal = Journal("words.journal")
+    _, end = journal.append(record("apple", [1, 0, 1]))
+    journal.append(record("pear", [0, 1, 1]))
+    oldId = journal.id()
+    journal.dropBefore(end)
+    assert journal.id() not in (None, oldId)
+    records, _ = journal.replay((oldId, end))
+    assert [r["word"] for r in records] == ["pear"]
+
+    # Appends after another writer rewrote the file go to the new file
+    journal.append(record("plum", [1, 0, 1]))
+    records, _ = journal.replay()
+    assert [r["word"] for r in records] == ["pear", "plum"]
+
+    journal.dropBefore(journal.size())
+    assert journal.replay() == ([], 0)
+    journal.close()
@@ -0,0 +1,33 @@
+from benchmarks.soak_benchmark import soak, stackDepth
+from Brain import Management
+from FileManagment import FileManagement
+from Headless import discard
+from TextToSpeech import RecordingTTS
+
+
+# Every menu action returns to the same loop, so the stack never grows
+def test_many_menu_actions_keep_the_stack_flat():
+    dispatched, menuDepths, _ = soak(actions=2000, size=20, checkpoint=1000, seed=1)
+    assert dispatched == 2000
+    assert len(menuDepths) == 1
+
+
+def test_invalid_choices_and_ctrl_c_at_the_menu(workDir):
+    storage = FileManagement("data")
+    management = Management(storage, RecordingTTS(), output=discard)
+    depths = []
+    choices = iter(["x"] * 5000)
+
+    def menuInput(prompt=""):
+        depths.append(stackDepth())
+        choice = next(choices, None)
+        if choice is None:
+            raise KeyboardInterrupt
+        return choice
+
+    management.input = menuInput
+    try:
+        management.mainSystemLoop()
+    except SystemExit:
+        pass
+    assert len(depths) == 5001 and len(set(depths)) == 1
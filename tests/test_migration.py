@@ -0,0 +1,52 @@
+from FileManagment import FileManagement
+from PhrasalVerb import PhrasalVerb
+from SqliteStorage import SqliteStorage, migrateFromJson
+from Word import Word
+
+
+def states(items):
+    return sorted(item.toDict().items() for item in items)
+
+
+def test_json_decks_and_journal_move_to_sqlite(workDir):
+    storage = FileManagement()
+    words = storage.readWords()
+    phrasal_verbs = storage.readPhrasalVerbs()
+    for text in ("apple", "pear", "plum"):
+        words.append(Word(text, difficulty=2.0))
+    phrasal_verbs.append(PhrasalVerb("look up", difficulty=1.0))
+    storage.saveWords(words)
+    storage.savePhrasalVerbs(phrasal_verbs)
+    storage.flush()
+    # Answered after the last save: only in the journal
+    apple = words.find("apple")
+    apple.recordAnswer(True)
+    apple.review(5, 1000.0)
+    storage.recordWord(apple)
+    storage.flush()
+    storage.close()
+
+    assert migrateFromJson() == (3, 1)
+    migrateFromJson()
+
+    source = FileManagement()
+    sqlite = SqliteStorage()
+    try:
+        assert states(sqlite.readWords()) == states(source.readWords())
+        assert states(sqlite.readPhrasalVerbs()) == states(source.readPhrasalVerbs())
+        apple = sqlite.words.find("apple")
+        # Migrating twice doesn't count the answers twice
+        assert (apple.rightCount, apple.asked, apple.dueAt) == (1, 1, 1000.0 + Word.SECONDS_PER_DAY)
+    finally:
+        source.close()
+        sqlite.close()
+
+
+def test_reset_archives_next_to_the_database(workDir):
+    sqlite = SqliteStorage("db/practice.sqlite3")
+    words = sqlite.readWords()
+    words.append(Word("apple", rightCount=2, asked=2, difficulty=1.0))
+    sqlite.resetWordScore()
+    sqlite.close()
+    archives = list((workDir / "db").glob("Archive-Words-*.json"))
+    assert len(archives) == 1 and not (workDir / "data").exists()
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from PracticeServer import MAX_HEADERS, HttpError, PracticeServer, readRequest
+
+
+def parse(data, limit=2 ** 16):
+    async def run():
+        reader = asyncio.StreamReader(limit=limit)
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await readRequest(reader)
+    return asyncio.run(run())
+
+
+def test_reads_a_request_with_a_body():
+    method, target, keepAlive, body = parse(b"POST /users/a/answer HTTP/1.1\r\nContent-Length: 4\r\n\r\n{}  ")
+    assert (method, target, keepAlive, body) == ("POST", "/users/a/answer", True, b"{}  ")
+
+
+@pytest.mark.parametrize("length", [b"-1", b"abc", b"+4", b"1_0", b""])
+def test_malformed_content_length_is_a_bad_request(length):
+    with pytest.raises(HttpError) as error:
+        parse(b"POST /users/a/answer HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}")
+    assert error.value.status == 400
+
+
+def test_oversized_and_too_many_headers_are_bad_requests():
+    with pytest.raises(HttpError) as error:
+        parse(b"GET /health HTTP/1.1\r\nX-Big: " + b"a" * 1000 + b"\r\n\r\n", limit=100)
+    assert error.value.status == 400
+    headers = b"".join(b"X-%d: 1\r\n" % i for i in range(MAX_HEADERS + 1))
+    with pytest.raises(HttpError) as error:
+        parse(b"GET /health HTTP/1.1\r\n" + headers + b"\r\n")
+    assert error.value.status == 400
+    assert parse(b"GET /health HTTP/1.1\r\n" + headers[:headers.index(b"X-%d" % MAX_HEADERS)] + b"\r\n")
+
+
+def test_add_items_counts_each_new_spelling_once(workDir):
+    async def run():
+        server = PracticeServer("users", seed=1)
+        try:
+            first = await server.addItems("alice", "words", ["apple", "Apple ", " ", 3, "pear"])
+            second = await server.addItems("alice", "words", ["pear", "plum"])
+            return first, second
+        finally:
+            await server.close()
+    first, second = asyncio.run(run())
+    assert first == {"kind": "words", "added": 2, "total": 2}
+    assert second == {"kind": "words", "added": 1, "total": 3}
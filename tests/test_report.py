@@ -0,0 +1,25 @@
+import random
+
+from Report import buildReport
+from SqliteStorage import SqliteStorage
+from Word import Word
+
+
+def test_sqlite_report_matches_the_in_memory_one(workDir):
+    rng = random.Random(4)
+    storage = SqliteStorage()
+    words = storage.readWords()
+    for i in range(300):
+        right, wrong = rng.randrange(10), rng.randrange(4)
+        words.append(Word(f"word{i}", rightCount=right, wrongCount=wrong, asked=right + wrong,
+                          streak=rng.randrange(right + 1), difficulty=1.0))
+    storage.saveWords(words)
+    # An answer not saved yet is written before the report is computed
+    words.find("word7").recordAnswer(False)
+
+    for limit in (3, 10):
+        expected = buildReport(words, "word", limit)
+        report = storage.reportStats(words, "word", limit)
+        assert report["struggling"] and report["mastered"]
+        assert report == expected
+    storage.close()
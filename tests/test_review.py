@@ -0,0 +1,44 @@
+import pytest
+
+from PhrasalVerb import PhrasalVerb
+from Word import Word
+
+DAY = Word.SECONDS_PER_DAY
+
+
+@pytest.mark.parametrize("cls", [Word, PhrasalVerb])
+def test_intervals_grow_with_each_good_review(cls):
+    item = cls("look up", difficulty=1.0)
+    now = 1000.0
+    intervals = []
+    for _ in range(4):
+        item.review(5, now)
+        intervals.append(item.interval)
+        assert item.dueAt == now + item.interval * DAY
+    # 1 day, 6 days, then the previous interval times the ease
+    assert intervals[:2] == [1, 6]
+    assert intervals[2] == round(6 * 2.7)
+    assert intervals[3] == round(intervals[2] * 2.8)
+    assert item.ease == pytest.approx(2.9)
+    assert item.repetitions == 4
+
+
+@pytest.mark.parametrize("cls", [Word, PhrasalVerb])
+def test_a_failed_review_starts_over(cls):
+    item = cls("give in", difficulty=1.0)
+    for _ in range(3):
+        item.review(4, 0.0)
+    assert item.interval > 6
+    item.review(1, 0.0)
+    assert (item.repetitions, item.interval, item.dueAt) == (0, 1, DAY)
+    assert item.ease == pytest.approx(2.5 - 0.54)
+
+
+def test_ease_never_drops_below_the_minimum():
+    word = Word("apple", difficulty=1.0)
+    for _ in range(10):
+        word.review(0, 0.0)
+    assert word.ease == Word.MIN_EASE
+    # Quality 3 still counts as remembered, with a lower ease
+    word.review(3, 0.0)
+    assert word.repetitions == 1 and word.ease == Word.MIN_EASE
@@ -0,0 +1,54 @@
+import random
+
+from Sampler import WeightedSampler
+from Scheduler import Scheduler
+from Word import Word
+
+
+def test_draws_follow_the_weights():
+    items = list("abcd")
+    weights = {"a": 1.0, "b": 2.0, "c": 3.0, "d": 4.0}
+    sampler = WeightedSampler(items, weight=weights.get, rng=random.Random(1))
+    draws = 40000
+    counts = dict.fromkeys(items, 0)
+    for _ in range(draws):
+        counts[sampler.draw()] += 1
+    for item in items:
+        assert abs(counts[item] / draws - weights[item] / 10) < 0.01
+
+
+def test_updated_and_removed_items():
+    weights = {"a": 1.0, "b": 1.0, "c": 1.0}
+    sampler = WeightedSampler(list(weights), weight=weights.get, rng=random.Random(2))
+    sampler.remove("a")
+    weights["b"] = 0.0
+    sampler.update("b")
+    assert {sampler.draw() for _ in range(1000)} == {"c"}
+    sampler.remove("c")
+    assert sampler.draw() is None
+
+
+def test_struggling_words_are_explored_more_often():
+    struggling = Word("hard", rightCount=1, wrongCount=4, asked=5, difficulty=1.0)
+    mastered = Word("easy", rightCount=10, asked=10, streak=10, difficulty=1.0)
+    assert struggling.category == Word.CATEGORY_STRUGGLING
+    assert mastered.category == Word.CATEGORY_MASTERED
+    sampler = WeightedSampler([struggling, mastered], rng=random.Random(3))
+    draws = [sampler.draw() for _ in range(2000)]
+    assert draws.count(struggling) > 3 * draws.count(mastered)
+
+
+def test_scheduler_exploits_the_weakest_item_and_rekeys_answers():
+    words = [Word(text, difficulty=1.0) for text in ("apple", "pear", "plum")]
+    scheduler = Scheduler(words, random.Random(4))
+    scheduler.EXPLOIT_PROBABILITY = 1.0
+    assert scheduler.next() is words[0]
+    # Three right answers: average with a streak, now behind the unasked words
+    for _ in range(3):
+        words[0].recordAnswer(True)
+    scheduler.update(words[0])
+    assert scheduler.next() is words[1]
+    scheduler.remove(words[1])
+    assert words[1] not in scheduler
+    assert scheduler.next() is words[2]
+    assert scheduler.upcoming(3) == [words[2], words[0]]
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from PhrasalVerb import PhrasalVerb
+from Scheduler import Scheduler
+from Scoring import CATEGORIES, DeckScores, recategorize
+from Word import Word
+
+
+def randomDeck(cls, count, seed):
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        right, wrong = rng.randrange(12), rng.randrange(6)
+        item = cls(f"item{i}", rightCount=right, wrongCount=wrong, asked=right + wrong,
+                   streak=rng.randrange(right + 1), difficulty=rng.choice([1.0, 2.0, 3.0]))
+        # Stale categories, as after answers that were not recategorized yet
+        item.category = rng.choice(CATEGORIES)
+        items.append(item)
+    return items
+
+
+def test_ranking_matches_the_per_object_keys():
+    for cls in (Word, PhrasalVerb):
+        items = randomDeck(cls, 500, seed=1)
+        keys, order = DeckScores(items).ranking()
+        assert keys == [item.priorityKey() for item in items]
+        assert order.tolist() == sorted(range(len(items)), key=lambda i: (items[i].priorityKey(), i))
+
+
+def test_recategorize_matches_update_category():
+    items = randomDeck(Word, 500, seed=2)
+    expected = randomDeck(Word, 500, seed=2)
+    for item in expected:
+        item.update_category()
+    changed = recategorize(items)
+    assert changed > 0
+    assert [item.category for item in items] == [item.category for item in expected]
+    assert recategorize(items) == 0
+
+
+@pytest.mark.parametrize("vectorizedFrom", [0, 10 ** 9])
+def test_scheduler_starts_from_the_best_ranked_item(monkeypatch, vectorizedFrom):
+    monkeypatch.setattr(Scheduler, "VECTORIZED_FROM", vectorizedFrom)
+    items = randomDeck(Word, 200, seed=3)
+    scheduler = Scheduler(items, random.Random(0))
+    best = min(range(len(items)), key=lambda i: (items[i].priorityKey(), i))
+    assert scheduler.peek() is items[best]
+    assert scheduler.upcoming(5) == sorted(items, key=lambda item: item.priorityKey())[:5]
@@ -0,0 +1,14 @@
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# NumPy costs about 100 ms to import; only the vectorized paths may load it
+def test_importing_the_app_does_not_load_numpy():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, Brain, PracticeServer; print('numpy' in sys.modules)"],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "False"